@@ -0,0 +1,117 @@
+"""
+Navis Router Mesh Load Test
+===========================
+
+Measures aggregate message throughput through a local router mesh as the
+number of routers grows.
+
+For each mesh size, ``--workers`` processes each simulate one zone of the
+fleet: a publisher session and a subscriber session, both attached in
+client mode to router ``worker % routers``, exchanging ``Measurement``
+messages on the zone's own keys as fast as the publisher can put them. The
+reported throughput is the number of messages received per second by all
+subscribers together.
+
+Routers are separate processes (``zenohd``, or Python routers when it is
+not installed), so throughput only scales with the router count when the
+host has cores to spare for them.
+
+Usage:
+    uv run python benchmarks/router_mesh.py --routers 1 2 4 --workers 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+import msgspec
+import zenoh
+
+from navis.header import encode_header
+from navis.mesh import local_mesh, session_config
+from navis.messages import DifferentialDriveState, Measurement
+from navis.router import RouterMesh
+
+
+def worker(index, endpoint, duration, start, results):
+    """Publish measurements on one zone and count those received."""
+    subscriber_session = zenoh.open(session_config(endpoint))
+    publisher_session = zenoh.open(session_config(endpoint))
+    zone_keys = f"navis/robots/zone-{index}/*/measurement"
+    received = [0]
+
+    def callback(sample):
+        received[0] += 1
+
+    subscriber_session.declare_subscriber(zone_keys, callback)
+    publishers = [publisher_session.declare_publisher(
+        f"navis/robots/zone-{index}/robot-{i}/measurement") for i in range(10)]
+    payload = msgspec.msgpack.encode(Measurement(
+        x=1.0, y=2.0, theta=0.5, state=DifferentialDriveState(v=1.0, omega=0.1,
+                                                              wheel_velocities=[1.0, 1.0])))
+    start.wait()
+    time.sleep(0.5)  # Let every worker's subscription propagate.
+
+    sent, seq = 0, 0
+    begin = time.monotonic()
+    counted_from = received[0]
+    while time.monotonic() - begin < duration:
+        seq += 1
+        for publisher in publishers:
+            publisher.put(payload, attachment=encode_header(seq))
+        sent += len(publishers)
+    elapsed = time.monotonic() - begin
+    time.sleep(0.5)  # Drain in-flight samples.
+    results.put((sent, received[0] - counted_from, elapsed))
+    publisher_session.close()
+    subscriber_session.close()
+
+
+def run(router_counts, workers, duration, base_port):
+    """Run the load test for each mesh size and print a table."""
+    print(f"{os.cpu_count()} CPU(s), {workers} workers, {duration:g}s per run")
+    print(f"{'routers':>8} {'sent/s':>12} {'received/s':>12} {'scaling':>8}")
+    baseline = None
+    for count in router_counts:
+        nodes = local_mesh(count, base_port=base_port)
+        mesh = RouterMesh(nodes, id_service=False)
+        mesh.start()
+
+        start, results = mp.Event(), mp.Queue()
+        procs = [mp.Process(target=worker,
+                            args=(i, nodes[i % count].endpoint, duration, start, results))
+                 for i in range(workers)]
+        for proc in procs:
+            proc.start()
+        time.sleep(2.0)  # Let every worker connect and subscribe.
+        start.set()
+        totals = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        mesh.stop()
+
+        sent = sum(t[0] / t[2] for t in totals)
+        received = sum(t[1] / t[2] for t in totals)
+        baseline = baseline or received
+        print(f"{count:>8} {sent:>12,.0f} {received:>12,.0f} {received / baseline:>7.2f}x")
+        base_port += count
+
+
+def main():
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark aggregate throughput of a Navis router mesh")
+    parser.add_argument("--routers", type=int, nargs="+", default=[1, 2, 4],
+                        help="Mesh sizes to test")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Number of zone worker processes")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="Seconds of publishing per mesh size")
+    parser.add_argument("--base-port", type=int, default=7700,
+                        help="Port of the first router")
+    args = parser.parse_args()
+    run(args.routers, args.workers, args.duration, args.base_port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Navis Shared-Memory Transport Benchmark
+=======================================
+
+Compares inline Zenoh payloads with the shared-memory path of
+``navis.transport`` between two processes on the same host.
+
+A publisher process sends messages of 1 KB to 10 MB to a subscriber process
+over a local TCP link, one message at a time. The subscriber decodes each
+message (zero-copy ``memoryview`` field) and reports the one-way latency,
+measured on the shared monotonic clock.
+
+Per message, the inline path copies the payload into the Zenoh transport,
+through the socket and into a ``bytes`` object on reception. The
+shared-memory path copies it once into the shared slot and sends a small
+reference instead.
+
+Usage:
+    uv run python benchmarks/shm_transport.py
+"""
+import argparse
+import multiprocessing as mp
+import statistics
+import time
+
+import msgspec
+import zenoh
+
+from navis.transport import (
+    SHM_ENCODING,
+    SharedMemoryReader,
+    SharedMemoryWriter,
+    decode_payload,
+    encode_ref,
+)
+
+ENDPOINT = "tcp/127.0.0.1:7490"
+SIZES = [1 << 10, 16 << 10, 256 << 10, 1 << 20, 4 << 20, 10 << 20]
+
+
+class Blob(msgspec.Struct):
+    """Benchmark message: a send timestamp and an opaque payload."""
+    stamp: float
+    data: memoryview
+
+
+def _config(listen: bool) -> zenoh.Config:
+    """Return a peer configuration linking the two benchmark processes."""
+    config = zenoh.Config()
+    config.insert_json5("scouting/multicast/enabled", "false")
+    key = "listen/endpoints" if listen else "connect/endpoints"
+    config.insert_json5(key, f'["{ENDPOINT}"]')
+    return config
+
+
+def subscriber(ready, stop, results):
+    """Decode incoming blobs and report their one-way latency."""
+    session = zenoh.open(_config(listen=True))
+    decoder = msgspec.msgpack.Decoder(Blob)
+    reader = SharedMemoryReader()
+
+    def callback(sample):
+        blob = decode_payload(sample, decoder.decode, reader)
+        latency = time.monotonic() - blob.stamp
+        size = len(blob.data)
+        del blob
+        results.put((size, latency))
+
+    session.declare_subscriber("bench/blob", callback)
+    ready.set()
+    stop.wait()
+    reader.close()
+    session.close()
+
+
+def run(sizes, iterations):
+    """Run the benchmark and print a table of median and p99 latencies."""
+    ready, stop, results = mp.Event(), mp.Event(), mp.Queue()
+    proc = mp.Process(target=subscriber, args=(ready, stop, results))
+    proc.start()
+    ready.wait()
+
+    session = zenoh.open(_config(listen=False))
+    time.sleep(1.0)
+    encoder = msgspec.msgpack.Encoder()
+    writer = SharedMemoryWriter(slots=4)
+
+    print(f"{'size':>10} {'inline p50':>12} {'inline p99':>12} "
+          f"{'shm p50':>12} {'shm p99':>12} {'speedup':>8}")
+    for size in sizes:
+        data = memoryview(bytes(size))
+        count = max(5, min(iterations, (64 << 20) // size))
+        stats = {}
+        for mode in ("inline", "shm"):
+            latencies = []
+            for _ in range(count):
+                payload = encoder.encode(Blob(stamp=time.monotonic(), data=data))
+                if mode == "shm":
+                    session.put("bench/blob", encode_ref(writer.write(payload)),
+                                encoding=SHM_ENCODING)
+                else:
+                    session.put("bench/blob", payload)
+                _, latency = results.get()
+                latencies.append(latency * 1e3)
+            latencies.sort()
+            stats[mode] = (statistics.median(latencies),
+                           latencies[int(0.99 * (len(latencies) - 1))])
+        speedup = stats["inline"][0] / stats["shm"][0]
+        print(f"{size:>10} {stats['inline'][0]:>10.3f}ms {stats['inline'][1]:>10.3f}ms "
+              f"{stats['shm'][0]:>10.3f}ms {stats['shm'][1]:>10.3f}ms {speedup:>7.1f}x")
+
+    stop.set()
+    proc.join()
+    writer.close()
+    session.close()
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark inline vs shared-memory Navis payloads")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Messages per payload size and mode")
+    args = parser.parse_args()
+    run(SIZES, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,16 +25,30 @@ from .api import (
     DeviceController,
     list_devices,
 )
+from .host import DeviceHost
+from .observer import FleetObserver
 
 # Promote the base robot classes for users who want to create their own robots.
 
+# Camera streaming for the ``CAMERAS`` category.
+from .camera import (
+    CameraPublisher,
+    CameraSubscriber,
+)
+
 # Make the messages sub-package directly accessible.
 from .messages import (
     Measurement,
     Move,
     Register,
     DifferentialDriveState,
-    SpotState
+    SpotState,
+    CameraFrame,
+    CommandAck,
+    Trajectory,
+    Waypoint,
+    PoseWaypoint,
+    TrajectoryProgress,
 )
 
 # Define the public API for `from navis import *`
@@ -42,6 +56,12 @@ __all__ = [
     # From api.py
     "RobotClient",
     "RobotController",
+    "DeviceHost",
+    "FleetObserver",
+
+    # From camera.py
+    "CameraPublisher",
+    "CameraSubscriber",
 
     # Sub-package
     "messages"
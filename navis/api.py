@@ -11,21 +11,55 @@ controller for sending commands, and utilities for device discovery.
 Key abstractions:
     - ``DeviceInterface`` (ABC): Defines the contract for a device.
     - ``DeviceClient``: Task runner for any device implementing the interface.
-    - ``DeviceController``: Tool for sending commands.
+    - ``DeviceController``: Tool for sending commands, one-off, streamed,
+      acknowledged or as whole trajectories.
     - ``list_devices``: Discover devices on the network.
 """
+import itertools
 import threading
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, InvalidStateError
 from dataclasses import dataclass
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Union
 
 import msgspec
 import zenoh
 from zenoh import Config
 
 from navis.categories import ROBOTS
-from navis.messages import Register, Move
+from navis.congestion import (
+    CONTROL,
+    DEFAULT_BACKOFF_RANGE,
+    DISCOVERY,
+    TELEMETRY,
+    CongestionMonitor,
+    PriorityClass,
+    adapt_interval,
+    priority_class,
+)
+from navis.header import decode_header, encode_header
+from navis.messages import (
+    CancelTrajectory,
+    CommandAck,
+    Move,
+    Register,
+    Trajectory,
+    TrajectoryProgress,
+)
+from navis.mesh import session_config
+from navis.metrics import LatencyHistogram
+from navis.prediction import DeadbandFilter
+from navis.trajectory import TrajectoryExecutor
+from navis.transport import (
+    DEFAULT_SHM_THRESHOLD,
+    SHM_ENCODING,
+    SharedMemoryWriter,
+    decode_payload,
+    encode_ref,
+    payload_buffer,
+)
+from navis.zones import DEFAULT_ZONE, ZoneMap, device_key, parse_key, selector
 
 
 class DeviceInterface(ABC):
@@ -47,31 +81,337 @@ class DeviceInterface(ABC):
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class PublisherTask:
     """
     Defines a periodic publishing task for a device.
 
+    Tasks of an adaptive priority class publish every ``interval_seconds``
+    while the network is clear and back off towards
+    ``max_interval_seconds`` while it is congested.
+
+    Tasks are slotted, as a ``DeviceHost`` keeps several per hosted device.
+
     Attributes:
         topic_suffix (str): Suffix of the topic to publish to.
         data_provider (Callable): Function returning the data to publish.
-        interval_seconds (float): Period between successive publishes.
+        interval_seconds (float): Period between successive publishes when
+            the network is clear.
+        max_interval_seconds (float): Slowest period under congestion.
+            Defaults to ``DEFAULT_BACKOFF_RANGE`` times ``interval_seconds``
+            for adaptive classes, ``interval_seconds`` otherwise.
+        priority (PriorityClass): Priority class of the published samples.
+        deadband (DeadbandFilter): If set, measurements consumers can
+            predict within its tolerances are not sent.
+        topic (str): Full key the task publishes on.
+        current_interval (float): Period currently in use.
+        seq (int): Sequence number of the last published sample.
+        next_run (float): ``time.monotonic()`` time of the next publish.
+        publisher (zenoh.Publisher): Publisher declared for ``topic``, if any.
+        timer (Timer): Scheduled next run, for tasks driven by a ``TimerWheel``.
     """
     topic_suffix: str
     data_provider: Callable
     interval_seconds: float
+    max_interval_seconds: float = None
+    priority: PriorityClass = TELEMETRY
+    deadband: DeadbandFilter = None
+    topic: str = ""
+    current_interval: float = 0.0
+    seq: int = 0
+    next_run: float = 0.0
+    publisher: zenoh.Publisher = None
+    timer: object = None
+
+    def __post_init__(self):
+        if self.max_interval_seconds is None:
+            self.max_interval_seconds = self.interval_seconds
+            if self.priority.adaptive:
+                self.max_interval_seconds *= DEFAULT_BACKOFF_RANGE
+        if self.max_interval_seconds < self.interval_seconds:
+            raise ValueError("max_interval_seconds must not be shorter than interval_seconds.")
+        self.current_interval = self.interval_seconds
+
+    def adapt(self, congested: bool):
+        """
+        Update ``current_interval`` after a publish.
+
+        Args:
+            congested (bool): Whether congestion is currently detected.
+        """
+        if self.priority.adaptive:
+            self.current_interval = adapt_interval(
+                self.current_interval, self.interval_seconds, self.max_interval_seconds, congested)
+
+
+def publish_task_sample(task: PublisherTask, encoder, put: Callable,
+                        on_position: Callable = None) -> bool:
+    """
+    Sample a task's data provider and publish the result.
+
+    Args:
+        task (PublisherTask): The task to run.
+        encoder: ``msgspec`` encoder for the data.
+        put (Callable): Called with the task, the encoded payload and the
+            header attachment to send them. It records the duration of the
+            network put itself to the congestion monitor.
+        on_position (Callable, optional): Called with the ``x`` and ``y`` of
+            data that has them, before it is published (e.g., to follow zones).
+
+    Returns:
+        bool: Whether a sample was published; ``False`` if the provider
+            returned ``None`` or the deadband withheld the sample.
+    """
+    data = task.data_provider()
+    if data is None:
+        return False
+    if on_position is not None and hasattr(data, "x") and hasattr(data, "y"):
+        on_position(data.x, data.y)
+    stamp = time.time()
+    if task.deadband is not None and not task.deadband.should_send(stamp, data):
+        return False
+    task.seq += 1
+    put(task, encoder.encode(data), encode_header(task.seq, stamp))
+    return True
+
+
+def relocate_tasks(tasks: List[PublisherTask], category: str, device_id: str, zone: str,
+                   zone_map: ZoneMap, x: float, y: float, announce: Callable) -> str:
+    """
+    Move a device's publisher tasks to the zone containing ``(x, y)``.
+
+    Args:
+        tasks (List[PublisherTask]): The device's tasks; their ``topic`` is
+            updated when the zone changes.
+        category (str): Category of the device.
+        device_id (str): ID of the device.
+        zone (str): Current zone of the device.
+        zone_map (ZoneMap): Zones the device moves between.
+        x (float): Current X position.
+        y (float): Current Y position.
+        announce (Callable): Called with the ``register`` task when the zone
+            changes, to publish it right away.
+
+    Returns:
+        str: The zone of the device, ``zone`` if it did not change.
+    """
+    new_zone = zone_map.locate(x, y, zone)
+    if new_zone == zone:
+        return zone
+    for task in tasks:
+        task.topic = device_key(category, new_zone, device_id, task.topic_suffix)
+        if task.topic_suffix == "register":
+            # Re-announce right away so discovery sees the new zone.
+            announce(task)
+    return new_zone
+
+
+def device_trajectory_executor(device: DeviceInterface, session: zenoh.Session, encoder,
+                               progress_key: Callable, name: str) -> TrajectoryExecutor:
+    """
+    Create the trajectory executor of a device, publishing its progress.
+
+    Args:
+        device (DeviceInterface): The device receiving the setpoints.
+        session (zenoh.Session): Session the progress reports are put on.
+        encoder: ``msgspec`` encoder for the reports.
+        progress_key (Callable): Returns the key to report on, which
+            follows the device's zone.
+        name (str): Prefix of the log messages.
+
+    Returns:
+        TrajectoryExecutor: The executor.
+    """
+    seqs = itertools.count(1)
+
+    def publish_progress(progress: TrajectoryProgress):
+        if progress.status != "running":
+            print(f"[{name}] Trajectory '{progress.trajectory_id}' {progress.status} "
+                  f"({progress.completed}/{progress.total} setpoints)")
+        # Controllers wait for the final report, so it must not be dropped.
+        priority = TELEMETRY if progress.status == "running" else CONTROL
+        session.put(progress_key(), encoder.encode(progress), attachment=encode_header(next(seqs)),
+                    priority=priority.priority, congestion_control=priority.congestion_control)
+
+    return TrajectoryExecutor(device.dispatch_command, publish_progress)
+
+
+def dispatch_device_command(command: msgspec.Struct, device: DeviceInterface,
+                            trajectories: TrajectoryExecutor, name: str):
+    """
+    Hand a command to a device's trajectory executor or to the device.
+
+    ``Trajectory`` and ``CancelTrajectory`` commands go to the executor; a
+    ``Move`` preempts the running trajectory before reaching the device.
+
+    Args:
+        command (msgspec.Struct): The decoded command.
+        device (DeviceInterface): The device.
+        trajectories (TrajectoryExecutor): The device's trajectory executor.
+        name (str): Prefix of the log messages.
+    """
+    if isinstance(command, Trajectory):
+        print(f"[{name}] Executing trajectory '{command.trajectory_id}'")
+        trajectories.execute(command)
+    elif isinstance(command, CancelTrajectory):
+        trajectories.cancel(command.trajectory_id)
+    else:
+        if isinstance(command, Move) and trajectories.preempt():
+            print(f"[{name}] Trajectory preempted by a Move command")
+        device.dispatch_command(command)
+
+
+def build_command(data, command_registry: Dict[str, type]) -> msgspec.Struct:
+    """
+    Turn a decoded command payload into a command object.
+
+    Args:
+        data: The decoded payload; a ``msgspec.Struct`` or a dict tagged
+            with the command class name under ``__type__``.
+        command_registry (Dict[str, type]): Command classes by name.
+
+    Returns:
+        msgspec.Struct: The command to dispatch.
+
+    Raises:
+        ValueError: If the payload has an unknown type or an invalid format.
+    """
+    if isinstance(data, msgspec.Struct):
+        return data
+    if isinstance(data, dict) and '__type__' in data:
+        msg_type_name = data.pop('__type__')
+        if msg_type_name not in command_registry:
+            raise ValueError(f"Unknown command type: {msg_type_name}")
+        try:
+            return msgspec.convert(data, command_registry[msg_type_name])
+        except msgspec.ValidationError as e:
+            raise ValueError(f"Invalid {msg_type_name} command: {e}")
+    raise ValueError(f"Invalid command format: {type(data)}")
+
+
+def is_stale_command(command: msgspec.Struct, attachment, max_age: float) -> bool:
+    """
+    Return whether a ``Move`` command is too old to be worth executing.
+
+    Args:
+        command (msgspec.Struct): The decoded command.
+        attachment (zenoh.ZBytes | None): Attachment of the received message.
+        max_age (float): Maximum age in seconds; ``None`` disables the check.
+
+    Returns:
+        bool: ``True`` for a ``Move`` whose header stamp is older than ``max_age``.
+    """
+    if max_age is None or not isinstance(command, Move):
+        return False
+    header = decode_header(attachment)
+    return header is not None and time.time() - header.stamp > max_age
+
+
+@dataclass
+class CommandResult:
+    """
+    Outcome of an acknowledged command.
+
+    Attributes:
+        status (str): ``"ok"`` if the device dispatched the command,
+            ``"error"`` if dispatching failed, ``"stale"`` if the device
+            discarded it as too old.
+        rtt_seconds (float): Time from sending the command to receiving the
+            acknowledgement.
+        dispatch_seconds (float): Time the device spent in ``dispatch_command``.
+        error (str): Failure reason reported by the device, if any.
+    """
+    status: str
+    rtt_seconds: float
+    dispatch_seconds: float
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the device dispatched the command successfully."""
+        return self.status == "ok"
+
+
+def answer_command_query(query, dispatch: Callable, decoder, command_registry: Dict[str, type],
+                         encoder, max_command_age: float = None) -> CommandAck:
+    """
+    Dispatch a command received as a Zenoh query and reply with a ``CommandAck``.
+
+    Args:
+        query (zenoh.Query): The query carrying the encoded command.
+        dispatch (Callable): Called with the command, typically a device's
+            ``dispatch_command``.
+        decoder: ``msgspec`` decoder for command payloads.
+        command_registry (Dict[str, type]): Command classes by name.
+        encoder: ``msgspec`` encoder for the acknowledgement.
+        max_command_age (float, optional): ``Move`` commands older than this
+            are not dispatched and acknowledged with status ``"stale"``.
+
+    Returns:
+        CommandAck: The acknowledgement sent back.
+    """
+    start = time.perf_counter()
+    try:
+        data = decode_payload(query, decoder.decode)
+        cmd = build_command(data, command_registry)
+        if is_stale_command(cmd, query.attachment, max_command_age):
+            ack = CommandAck(status="stale", dispatch_seconds=0.0,
+                             error=f"Command older than {max_command_age}s")
+        else:
+            dispatch(cmd)
+            ack = CommandAck(status="ok", dispatch_seconds=time.perf_counter() - start)
+    except Exception as e:
+        ack = CommandAck(status="error", dispatch_seconds=time.perf_counter() - start,
+                         error=str(e))
+    query.reply(query.key_expr, encoder.encode(ack))
+    return ack
+
+
+def lease_ids(session: zenoh.Session, count: int = 1) -> List[str]:
+    """
+    Request unique device IDs from the router's ID service.
+
+    IDs are requested in bulk; ID services that only hand out one ID per
+    query are queried repeatedly.
+
+    Args:
+        session (zenoh.Session): Session used for the queries.
+        count (int): Number of IDs needed.
+
+    Returns:
+        List[str]: ``count`` unique IDs.
+
+    Raises:
+        RuntimeError: If the ID service does not reply or replies with an error.
+    """
+    ids: List[str] = []
+    while len(ids) < count:
+        replies = session.get(f"navis/admin/id_service?count={count - len(ids)}")
+        try:
+            reply = next(replies)
+        except StopIteration:
+            raise RuntimeError(
+                "Could not get a unique ID from the server (no replies).")
+        if not reply.ok:
+            raise RuntimeError("ID request failed: reply not ok.")
+        try:
+            ids.extend(bytes(reply.ok.payload).decode().split("\n"))
+        except Exception as e:
+            raise RuntimeError(f"Failed to decode ID service reply: {e}")
+    return ids[:count]
 
 
-def list_devices(category: str, timeout_seconds: float = 3.0) -> Dict[str, str]:
+def list_devices(category: str, timeout_seconds: float = 3.0, zone: str = "*") -> Dict[str, str]:
     """
     Discover devices on the network by listening for ``Register`` messages.
 
     Args:
         category (str): Device category (e.g., ``ROBOTS``).
         timeout_seconds (float): How long to listen for devices.
+        zone (str): Only discover devices in this zone; ``"*"`` for all zones.
 
     Returns:
-        Dict[str, str]: Mapping of ``robot_id`` -> ``robot_id`` for discovered devices.
+        Dict[str, str]: Mapping of ``robot_id`` -> zone for discovered devices.
     """
     session = zenoh.open(Config())
     devices_found: Dict[str, str] = {}
@@ -86,16 +426,18 @@ def list_devices(category: str, timeout_seconds: float = 3.0) -> Dict[str, str]:
             sample: The Zenoh sample containing registration data.
         """
         try:
-            reg = decoder.decode(bytes(sample.payload))
+            reg = decode_payload(sample, decoder.decode)
+            _, device_zone, _, _ = parse_key(sample.key_expr)
             with lock:
-                devices_found[reg.robot_id] = reg.robot_id
-                print(f"[Navis API] Discovered device: {reg.robot_id}")
+                if devices_found.get(reg.robot_id) != device_zone:
+                    print(f"[Navis API] Discovered device: {reg.robot_id} (zone '{device_zone}')")
+                devices_found[reg.robot_id] = device_zone
         except Exception as e:
             print(f"[DEBUG DISCOVERY] Error decoding Register: {e}")
 
-    selector = f"navis/{category}/*/register"
-    print(f"[Navis API] Listening on '{selector}' for {timeout_seconds}s...")
-    sub = session.declare_subscriber(selector, callback)
+    register_selector = selector(category, zone, "*", "register")
+    print(f"[Navis API] Listening on '{register_selector}' for {timeout_seconds}s...")
+    sub = session.declare_subscriber(register_selector, callback)
     try:
         time.sleep(timeout_seconds)
     finally:
@@ -109,89 +451,148 @@ def list_devices(category: str, timeout_seconds: float = 3.0) -> Dict[str, str]:
     with lock:
         return dict(devices_found)
 
-# [TODO] Some routings are hardcoded to publish to **/robots/**. Fix so that any device can publish to their corresponding
-# device category.
-
 
 class DeviceClient:
     """
     Generic client for a Navis device.
 
     Handles device registration, publishing periodic messages, and
-    subscribing to commands.
+    subscribing to commands. Topics live under
+    ``navis/<category>/<zone>/<device_id>/``; with a ``ZoneMap`` the zone
+    follows the position reported in published measurements.
+
+    Publishers of adaptive priority classes slow down while
+    ``self.congestion`` reports congestion, and speed back up once it clears.
+
+    ``Trajectory`` commands are executed by ``self.trajectories``, which
+    feeds their setpoints to ``dispatch_command`` on time and publishes
+    ``TrajectoryProgress`` on the ``trajectory`` topic. A ``Move`` received
+    directly preempts the running trajectory.
     """
 
-    def __init__(self, device_object: DeviceInterface, additional_messages: List[type] = None):
+    def __init__(self, device_object: DeviceInterface, additional_messages: List[type] = None,
+                 shared_memory: bool = False, shm_threshold_bytes: int = DEFAULT_SHM_THRESHOLD,
+                 category: str = ROBOTS, zone: str = DEFAULT_ZONE, zone_map: ZoneMap = None,
+                 max_command_age: float = None, congestion: CongestionMonitor = None,
+                 router: str = None):
         """
         Initialize a ``DeviceClient`` for a device.
 
         Args:
             device_object (DeviceInterface): Object implementing ``dispatch_command``.
             additional_messages (List[type], optional): Additional command types to register.
+            shared_memory (bool): Publish large payloads through shared memory
+                instead of inline. Only use when all consumers run on this host.
+            shm_threshold_bytes (int): Minimum encoded size for a payload to go
+                through shared memory.
+            category (str): Device category (e.g., ``ROBOTS``).
+            zone (str): Initial zone of the device.
+            zone_map (ZoneMap, optional): Zones to migrate between as the
+                device's published ``x``/``y`` position changes.
+            max_command_age (float, optional): Discard ``Move`` commands whose
+                source timestamp is older than this many seconds.
+            congestion (CongestionMonitor, optional): Congestion signals to
+                adapt publish rates to; share it with a ``DeviceController``
+                on the same link to include command round-trip times.
+            router (str, optional): Router to connect to: an endpoint, or
+                ``"auto"`` for the least-loaded router of the mesh. Routers
+                are discovered by scouting by default.
         """
         if not hasattr(device_object, "dispatch_command") or not callable(getattr(device_object, "dispatch_command")):
             raise TypeError(
                 "device_object must implement a callable ``dispatch_command(command)`` method.")
 
         self.device = device_object
-        self.session = zenoh.open(Config())
+        self.session = zenoh.open(session_config(router))
         self.encoder = msgspec.msgpack.Encoder()
+        self.shm_writer = SharedMemoryWriter() if shared_memory else None
+        self.shm_threshold_bytes = shm_threshold_bytes
+        self.category = category
+        self.zone = zone
+        self.zone_map = zone_map
+        self.max_command_age = max_command_age
+        self.stale_commands = 0
+        self.congestion = congestion if congestion is not None else CongestionMonitor()
+        self._congested = False
 
         # --- Get unique device ID ---
         print("[CLIENT] Requesting a unique ID from the server...")
-        replies = self.session.get("navis/admin/id_service")
-        try:
-            reply = next(replies)
-        except StopIteration:
-            self.session.close()
-            raise RuntimeError(
-                "Could not get a unique ID from the server (no replies).")
-
         try:
-            if reply.ok:
-                self.device_id = bytes(reply.ok.payload).decode()
-                print(f"[CLIENT] Assigned ID: {self.device_id}")
-            else:
-                self.session.close()
-                raise RuntimeError("ID request failed: reply not ok.")
-        except Exception as e:
+            self.device_id = lease_ids(self.session)[0]
+        except RuntimeError:
             self.session.close()
-            raise RuntimeError(f"Failed to decode ID service reply: {e}")
+            raise
+        print(f"[CLIENT] Assigned ID: {self.device_id}")
 
         # --- Publishers ---
-        self.publish_tasks: List[dict] = []
+        self.publish_tasks: List[PublisherTask] = []
         self.add_publisher(
             topic_suffix="register",
             data_provider=self._get_registration_msg,
-            interval_seconds=5.0
+            interval_seconds=5.0,
+            priority=DISCOVERY
         )
 
         # --- Command decoder ---
         self.decoder = msgspec.msgpack.Decoder()
-        self.command_registry = {'Move': Move}
+        self.command_registry = {'Move': Move, 'Trajectory': Trajectory,
+                                 'CancelTrajectory': CancelTrajectory}
         if additional_messages:
             for msg_type in additional_messages:
                 self.command_registry[msg_type.__name__] = msg_type
 
+        # --- Trajectory execution ---
+        self.trajectories = device_trajectory_executor(
+            self.device, self.session, self.encoder,
+            lambda: device_key(self.category, self.zone, self.device_id, "trajectory"),
+            self.device_id)
+
         # --- Thread control ---
         self._running = threading.Event()
         self._thread = None
 
-    def add_publisher(self, topic_suffix: str, data_provider: Callable, interval_seconds: float):
+    def add_publisher(self, topic_suffix: str, data_provider: Callable, interval_seconds: float,
+                      max_interval_seconds: float = None,
+                      priority: Union[str, PriorityClass] = TELEMETRY,
+                      deadband: DeadbandFilter = None) -> PublisherTask:
         """
         Register a periodic publisher task.
 
         Args:
             topic_suffix (str): Suffix for the Zenoh topic.
             data_provider (Callable): Function providing the data.
-            interval_seconds (float): Publish interval in seconds.
+            interval_seconds (float): Publish interval in seconds when the
+                network is clear.
+            max_interval_seconds (float, optional): Slowest publish interval
+                under congestion.
+            priority (str | PriorityClass): Priority class of the topic:
+                ``"control"``, ``"discovery"``, ``"telemetry"`` or ``"bulk"``.
+            deadband (DeadbandFilter, optional): Only send ``Measurement``
+                samples when consumers' dead-reckoned pose is off by more
+                than the filter's tolerances. ``interval_seconds`` is then
+                the sampling period.
+
+        Returns:
+            PublisherTask: The registered task.
         """
-        full_topic = f"navis/{ROBOTS}/{self.device_id}/{topic_suffix}"
-        task_state = {"topic": full_topic, "provider": data_provider,
-                      "interval": interval_seconds, "last_run": 0}
-        self.publish_tasks.append(task_state)
-        print(f"[{self.device_id}] Registered publisher for '{
+        task = PublisherTask(
+            topic_suffix=topic_suffix, data_provider=data_provider,
+            interval_seconds=interval_seconds, max_interval_seconds=max_interval_seconds,
+            priority=priority_class(priority), deadband=deadband,
+            topic=device_key(self.category, self.zone, self.device_id, topic_suffix))
+        self._declare_task_publisher(task)
+        self.publish_tasks.append(task)
+        print(f"[{self.device_id}] Registered {task.priority.name} publisher for '{
               topic_suffix}' ({interval_seconds}s)")
+        return task
+
+    def _declare_task_publisher(self, task: PublisherTask):
+        """Declare the publisher of a task on its current topic."""
+        if task.publisher is not None:
+            task.publisher.undeclare()
+        task.publisher = self.session.declare_publisher(
+            task.topic, priority=task.priority.priority,
+            congestion_control=task.priority.congestion_control, express=task.priority.express)
 
     def _get_registration_msg(self) -> Register:
         """Return a ``Register`` message with the device ID."""
@@ -200,19 +601,65 @@ class DeviceClient:
     def _publish_loop(self):
         """Run all publishers periodically until stopped."""
         while not self._running.is_set():
-            now = time.time()
+            now = time.monotonic()
+            congested = self._check_congestion()
             for task in self.publish_tasks:
+                if now < task.next_run:
+                    continue
                 try:
-                    if now - task["last_run"] >= task["interval"]:
-                        data = task["provider"]()
-                        if data is not None:
-                            self.session.put(
-                                task["topic"], self.encoder.encode(data))
-                        task["last_run"] = now
+                    publish_task_sample(task, self.encoder, self._put,
+                                        self._update_zone if self.zone_map is not None else None)
                 except Exception as e:
                     print(f"[{getattr(self, 'device_id', 'unknown')}] Publisher error on topic {
-                          task.get('topic')}: {e}")
-            time.sleep(0.05)
+                          task.topic}: {e}")
+                task.adapt(congested)
+                task.next_run = now + task.current_interval
+            next_run = min((task.next_run for task in self.publish_tasks), default=now + 0.05)
+            self._running.wait(min(max(next_run - time.monotonic(), 0.0), 0.05))
+
+    def _check_congestion(self) -> bool:
+        """Read the congestion state, logging when it changes."""
+        congested = self.congestion.congested
+        if congested != self._congested:
+            self._congested = congested
+            if congested:
+                print(f"[{self.device_id}] Congestion detected, backing off adaptive publishers")
+            else:
+                print(f"[{self.device_id}] Congestion cleared, restoring publish rates")
+        return congested
+
+    def _update_zone(self, x: float, y: float):
+        """Move all publishers to the zone containing ``(x, y)``, if it changed."""
+        zone = relocate_tasks(self.publish_tasks, self.category, self.device_id, self.zone,
+                              self.zone_map, x, y, self._announce)
+        if zone == self.zone:
+            return
+        print(f"[{self.device_id}] Moving from zone '{self.zone}' to '{zone}'")
+        self.zone = zone
+        for task in self.publish_tasks:
+            self._declare_task_publisher(task)
+
+    @staticmethod
+    def _announce(task: PublisherTask):
+        """Run a task on the next pass of the publish loop."""
+        task.next_run = 0.0
+
+    def _put(self, task: PublisherTask, payload: bytes, attachment: bytes = None):
+        """Publish an encoded payload, through shared memory when it is large."""
+        if self.shm_writer is not None and len(payload) >= self.shm_threshold_bytes:
+            payload = encode_ref(self.shm_writer.write(payload))
+            encoding = SHM_ENCODING
+        else:
+            encoding = None
+        # Only the put itself signals congestion; encoding and the
+        # shared-memory copy grow with the payload, not with the load.
+        start = time.perf_counter()
+        task.publisher.put(payload, encoding=encoding, attachment=attachment)
+        self.congestion.record_put(time.perf_counter() - start)
+
+    def _dispatch(self, cmd: msgspec.Struct):
+        """Hand a command to the trajectory executor or the device."""
+        dispatch_device_command(cmd, self.device, self.trajectories, self.device_id)
 
     def _command_callback(self, sample):
         """
@@ -222,47 +669,56 @@ class DeviceClient:
             sample: Zenoh sample containing the command message.
         """
         try:
-            data = self.decoder.decode(bytes(sample.payload))
-            if isinstance(data, msgspec.Struct):
-                print(f"[{self.device_id}] Received command: {
-                      type(data).__name__}")
-                self.device.dispatch_command(data)
+            data = decode_payload(sample, self.decoder.decode)
+            cmd = build_command(data, self.command_registry)
+            if is_stale_command(cmd, sample.attachment, self.max_command_age):
+                self.stale_commands += 1
+                print(f"[{self.device_id}] Discarded stale command: {type(cmd).__name__}")
                 return
-
-            if isinstance(data, dict) and '__type__' in data:
-                msg_type_name = data.pop('__type__')
-                if msg_type_name in self.command_registry:
-                    cmd_class = self.command_registry[msg_type_name]
-                    cmd = cmd_class(**data)
-                    print(f"[{self.device_id}] Received command: {
-                          msg_type_name}")
-                    self.device.dispatch_command(cmd)
-                else:
-                    print(f"[{self.device_id}] Unknown command type: {
-                          msg_type_name}")
-            else:
-                print(f"[{self.device_id}] Invalid command format: {type(data)}")
-
+            print(f"[{self.device_id}] Received command: {type(cmd).__name__}")
+            self._dispatch(cmd)
+        except ValueError as e:
+            print(f"[{self.device_id}] {e}")
         except Exception as e:
             print(f"[{self.device_id}] Command error: {e}")
             import traceback
             traceback.print_exc()
 
+    def _command_query_callback(self, query):
+        """
+        Dispatch an acknowledged command and reply with its outcome.
+
+        Args:
+            query: Zenoh query containing the command message.
+        """
+        ack = answer_command_query(query, self._dispatch, self.decoder, self.command_registry,
+                                   self.encoder, self.max_command_age)
+        if ack.status == "ok":
+            print(f"[{self.device_id}] Acknowledged command ({ack.dispatch_seconds * 1e3:.2f} ms)")
+        elif ack.status == "stale":
+            self.stale_commands += 1
+            print(f"[{self.device_id}] Discarded stale command")
+        else:
+            print(f"[{self.device_id}] Command error: {ack.error}")
+
     def start(self):
         """Start publishing tasks and subscribe to commands."""
         if self._thread and self._thread.is_alive():
             return
         print(f"[{self.device_id}] Starting client...")
         self._running.clear()
-        command_topic = f"navis/{ROBOTS}/{self.device_id}/commands"
+        # Commands are accepted from any zone so migrations never lose them.
+        command_topic = device_key(self.category, "*", self.device_id, "commands")
         print(f"[{self.device_id}] Subscribing to: {command_topic}")
         self.session.declare_subscriber(command_topic, self._command_callback)
+        self.session.declare_queryable(command_topic, self._command_query_callback)
         self._thread = threading.Thread(target=self._publish_loop, daemon=True)
         self._thread.start()
 
     def close(self):
         """Stop the client and close the Zenoh session."""
         print(f"[{self.device_id}] Closing client...")
+        self.trajectories.close()
         self._running.set()
         if self._thread:
             self._thread.join()
@@ -270,6 +726,8 @@ class DeviceClient:
             self.session.close()
         except Exception as e:
             print(f"[{self.device_id}] Error closing session: {e}")
+        if self.shm_writer is not None:
+            self.shm_writer.close()
 
 
 class DeviceController:
@@ -277,21 +735,56 @@ class DeviceController:
     Send commands to a specific Navis device.
 
     Provides convenience methods for common commands like ``Move``.
+    Commands are sent in the ``CONTROL`` priority class, ahead of telemetry.
     """
 
-    def __init__(self, device_id: str):
+    def __init__(self, device_id: str, category: str = ROBOTS, zone: str = "*",
+                 congestion: CongestionMonitor = None):
         """
         Initialize a controller for a device.
 
         Args:
             device_id (str): The target device ID.
+            category (str): Category of the device (e.g., ``ROBOTS``).
+            zone (str): Zone the device is in, or ``"*"`` to reach it in any zone.
+            congestion (CongestionMonitor, optional): Monitor fed with the
+                round-trip time of acknowledged commands.
         """
         self.device_id = device_id
         self.session = zenoh.open(Config())
         self.encoder = msgspec.msgpack.Encoder()
+        self.congestion = congestion
+        self.command_key = device_key(category, zone, self.device_id, "commands")
+        self.publisher = self.session.declare_publisher(
+            self.command_key, priority=CONTROL.priority,
+            congestion_control=CONTROL.congestion_control, express=CONTROL.express)
+        self.ack_decoder = msgspec.msgpack.Decoder(CommandAck)
+        self.progress_key = device_key(category, zone, self.device_id, "trajectory")
+        self.progress_decoder = msgspec.msgpack.Decoder(TrajectoryProgress)
+        self._progress_subscribers = []
+        self._command_seq = itertools.count(1)
+        # Round-trip times of acknowledged commands to this device.
+        self.latency = LatencyHistogram()
+
+        # --- Streaming state ---
+        self._setpoint = None
+        self._setpoint_time = 0.0
+        self._setpoint_lock = threading.Lock()
+        self._stream_stop = threading.Event()
+        self._stream_thread = None
         print(f"[Navis API] Controller initialized for device '{
               self.device_id}'.")
 
+    def _encode_command(self, command_object: msgspec.Struct) -> bytes:
+        """Encode a command together with its ``__type__`` tag."""
+        msg_dict = msgspec.structs.asdict(command_object)
+        msg_dict['__type__'] = type(command_object).__name__
+        return self.encoder.encode(msg_dict)
+
+    def _next_header(self) -> bytes:
+        """Return a fresh header for the next command sent to the device."""
+        return encode_header(next(self._command_seq))
+
     def send_command(self, command_object: msgspec.Struct):
         """
         Send any valid ``msgspec.Struct`` command to the device.
@@ -299,19 +792,217 @@ class DeviceController:
         Args:
             command_object (msgspec.Struct): The command to send.
         """
-        key = f"navis/{ROBOTS}/{self.device_id}/commands"
         try:
-            msg_dict = msgspec.structs.asdict(command_object)
-            msg_dict['__type__'] = type(command_object).__name__
-            payload = self.encoder.encode(msg_dict)
+            payload = self._encode_command(command_object)
             print(f"[Controller:{self.device_id}] Sending {
-                  type(command_object).__name__} to {key}")
-            self.session.put(key, payload)
+                  type(command_object).__name__} to {self.command_key}")
+            self.publisher.put(payload, attachment=self._next_header())
         except Exception as e:
             print(f"[Controller:{self.device_id}] Failed to send command: {e}")
             import traceback
             traceback.print_exc()
 
+    def send_command_acked(self, command_object: msgspec.Struct,
+                           timeout_seconds: float = 1.0) -> Future:
+        """
+        Send a command and get a future for the device's acknowledgement.
+
+        The command is sent as a Zenoh query; the device replies once
+        ``dispatch_command`` has returned. This call does not block, so
+        many commands can be in flight at once. The round-trip time of each
+        acknowledged command is recorded in ``self.latency``.
+
+        Args:
+            command_object (msgspec.Struct): The command to send.
+            timeout_seconds (float): Time to wait for the acknowledgement.
+
+        Returns:
+            Future: Resolves to a ``CommandResult``, or fails with
+                ``TimeoutError`` if no device acknowledged in time.
+        """
+        future = Future()
+        payload = self._encode_command(command_object)
+        sent = time.perf_counter()
+
+        def settle(method, value):
+            try:
+                method(value)
+            except InvalidStateError:
+                pass  # Already settled by an earlier reply.
+
+        def on_reply(reply):
+            rtt = time.perf_counter() - sent
+            if not reply.ok:
+                settle(future.set_exception, RuntimeError(
+                    f"Command query failed: {reply.err.payload.to_string()}"))
+                return
+            try:
+                ack = self.ack_decoder.decode(payload_buffer(reply.ok.payload))
+            except Exception as e:
+                settle(future.set_exception, e)
+                return
+            if ack.status == "ok":
+                self.latency.record(rtt)
+                if self.congestion is not None:
+                    self.congestion.record_rtt(rtt)
+            settle(future.set_result, CommandResult(
+                status=ack.status, rtt_seconds=rtt,
+                dispatch_seconds=ack.dispatch_seconds, error=ack.error))
+
+        def on_done():
+            settle(future.set_exception, TimeoutError(
+                f"No acknowledgement from device '{self.device_id}' within {timeout_seconds}s."))
+
+        self.session.get(self.command_key, zenoh.handlers.Callback(on_reply, on_done),
+                         payload=payload, attachment=self._next_header(),
+                         timeout=timeout_seconds, priority=CONTROL.priority,
+                         congestion_control=CONTROL.congestion_control, express=CONTROL.express)
+        return future
+
+    def send_trajectory(self, trajectory: Trajectory, timeout_seconds: float = 1.0) -> Future:
+        """
+        Upload a whole trajectory to the device in one acknowledged command.
+
+        The device dispatches the setpoints on its own clock, so their
+        timing does not depend on the link. Sending another trajectory or a
+        ``Move`` preempts it.
+
+        Args:
+            trajectory (Trajectory): The trajectory, e.g. from
+                ``navis.trajectory.velocity_trajectory``.
+            timeout_seconds (float): Time to wait for the acknowledgement.
+
+        Returns:
+            Future: Resolves to a ``CommandResult`` once the device has
+                started the trajectory; see ``send_command_acked``.
+        """
+        print(f"[Controller:{self.device_id}] Sending trajectory '{trajectory.trajectory_id}' "
+              f"({len(trajectory.waypoints) + len(trajectory.poses)} waypoints)")
+        return self.send_command_acked(trajectory, timeout_seconds)
+
+    def cancel_trajectory(self, trajectory_id: str = "", timeout_seconds: float = 1.0) -> Future:
+        """
+        Stop a trajectory running on the device.
+
+        Args:
+            trajectory_id (str): Only cancel this trajectory; an empty ID
+                cancels whatever is running.
+            timeout_seconds (float): Time to wait for the acknowledgement.
+
+        Returns:
+            Future: Resolves to a ``CommandResult``; see ``send_command_acked``.
+        """
+        return self.send_command_acked(CancelTrajectory(trajectory_id=trajectory_id),
+                                       timeout_seconds)
+
+    def on_trajectory_progress(self, callback: Callable):
+        """
+        Call ``callback`` with each ``TrajectoryProgress`` the device reports.
+
+        Args:
+            callback (Callable): Called from a Zenoh thread with the report.
+        """
+        def listener(sample):
+            try:
+                callback(self.progress_decoder.decode(payload_buffer(sample.payload)))
+            except Exception as e:
+                print(f"[Controller:{self.device_id}] Progress callback error: {e}")
+
+        self._progress_subscribers.append(
+            self.session.declare_subscriber(self.progress_key, listener))
+
+    def start_streaming(self, rate_hz: float = 20.0, timeout_seconds: float = 0.5):
+        """
+        Start sending the current setpoint to the device at a fixed rate.
+
+        A background thread sends the latest value given to
+        ``set_setpoint`` (or ``set_velocity``) once per period, no matter
+        how often it is updated in between. Nothing is sent until the first
+        setpoint is set. If the setpoint is not updated for
+        ``timeout_seconds``, it is replaced by a stop ``Move`` so the device
+        halts when the caller stops updating it.
+
+        Args:
+            rate_hz (float): Number of commands sent per second.
+            timeout_seconds (float): Maximum age of the setpoint before the
+                device is stopped.
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive.")
+        if self._stream_thread and self._stream_thread.is_alive():
+            return
+        self._stream_stop.clear()
+        self._stream_thread = threading.Thread(
+            target=self._stream_loop, args=(1.0 / rate_hz, timeout_seconds), daemon=True)
+        self._stream_thread.start()
+        print(f"[Controller:{self.device_id}] Streaming setpoints at {
+              rate_hz:g} Hz (timeout {timeout_seconds:g}s)")
+
+    def set_setpoint(self, command_object: msgspec.Struct):
+        """
+        Replace the command sent on the next streaming period.
+
+        Args:
+            command_object (msgspec.Struct): The new setpoint.
+        """
+        with self._setpoint_lock:
+            self._setpoint = command_object
+            self._setpoint_time = time.monotonic()
+
+    def set_velocity(self, linear_vel: float = 0.0, angular_vel: float = 0.0):
+        """
+        Convenience method to stream a ``Move`` setpoint.
+
+        Args:
+            linear_vel (float): Forward velocity.
+            angular_vel (float): Rotational velocity.
+        """
+        self.set_setpoint(Move(v=linear_vel, omega=angular_vel))
+
+    def stop_streaming(self):
+        """Stop the streaming thread, sending a final stop ``Move``."""
+        if not self._stream_thread:
+            return
+        self._stream_stop.set()
+        self._stream_thread.join()
+        self._stream_thread = None
+        with self._setpoint_lock:
+            self._setpoint = None
+        try:
+            self.publisher.put(self._encode_command(Move()), attachment=self._next_header())
+        except Exception as e:
+            print(f"[Controller:{self.device_id}] Failed to send stop command: {e}")
+        print(f"[Controller:{self.device_id}] Streaming stopped.")
+
+    def _stream_loop(self, period: float, timeout_seconds: float):
+        """Send the latest setpoint once per period until stopped."""
+        stop_payload = self._encode_command(Move())
+        timed_out = False
+        next_send = time.monotonic()
+        while not self._stream_stop.is_set():
+            with self._setpoint_lock:
+                setpoint, updated_at = self._setpoint, self._setpoint_time
+            try:
+                if setpoint is not None:
+                    if time.monotonic() - updated_at > timeout_seconds:
+                        if not timed_out:
+                            print(f"[Controller:{self.device_id}] Setpoint timed out, stopping device.")
+                            timed_out = True
+                        payload = stop_payload
+                    else:
+                        timed_out = False
+                        payload = self._encode_command(setpoint)
+                    self.publisher.put(payload, attachment=self._next_header())
+            except Exception as e:
+                print(f"[Controller:{self.device_id}] Streaming error: {e}")
+
+            # Keep a fixed rate; skip missed periods instead of bursting.
+            next_send += period
+            now = time.monotonic()
+            if next_send < now:
+                next_send = now
+            self._stream_stop.wait(next_send - now)
+
     def move(self, linear_vel: float = 0.0, angular_vel: float = 0.0):
         """
         Convenience method to send a ``Move`` command.
@@ -324,7 +1015,8 @@ class DeviceController:
         self.send_command(Move(v=linear_vel, omega=angular_vel))
 
     def close(self):
-        """Close the controller's Zenoh session."""
+        """Stop streaming and close the controller's Zenoh session."""
+        self.stop_streaming()
         try:
             self.session.close()
         except Exception as e:
@@ -0,0 +1,435 @@
+"""
+Navis Camera Streams
+====================
+
+Frame streaming for devices in the ``CAMERAS`` category.
+
+Frames are published on ``navis/cameras/<zone>/<device_id>/<stream>`` as
+``CameraFrame`` messages carrying the pixel buffer with its shape and dtype.
+Frames can be compressed (``"zlib"`` or ``"jpeg"``) and are split into
+chunks when they exceed the publisher's chunk size.
+
+Key abstractions:
+    - ``CameraPublisher``: Publishes frames for a ``DeviceClient``, either
+      pushed by the caller or pulled from a provider at a fixed rate.
+    - ``CameraSubscriber``: Receives frames with drop-oldest semantics per
+      stream, so a slow consumer always gets the newest frame of every
+      stream instead of a backlog.
+    - ``StreamStats``: Per-stream frame rate, latency and drop counters.
+"""
+import io
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import msgspec
+import numpy as np
+import zenoh
+from zenoh import Config
+
+from navis.categories import CAMERAS
+from navis.congestion import BULK
+from navis.header import encode_header
+from navis.messages import CameraFrame
+from navis.transport import SHM_ENCODING, decode_payload, encode_ref, is_shm_sample
+from navis.zones import device_key, parse_key
+
+COMPRESSIONS = ("raw", "zlib", "jpeg")
+
+
+def _require_pillow():
+    """Import Pillow, which is only needed for JPEG compression."""
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError(
+            "JPEG compression requires Pillow (``pip install pillow``).") from e
+    return Image
+
+
+def compress_frame(image: np.ndarray, compression: str, jpeg_quality: int = 85):
+    """
+    Encode an image array into the bytes sent in ``CameraFrame.data``.
+
+    Args:
+        image (np.ndarray): The frame. JPEG requires ``uint8`` with shape
+            ``(h, w)``, ``(h, w, 3)`` or ``(h, w, 4)``.
+        compression (str): One of ``"raw"``, ``"zlib"`` or ``"jpeg"``.
+        jpeg_quality (int): JPEG quality from 1 to 95.
+
+    Returns:
+        A bytes-like object. ``"raw"`` returns a view of the array itself.
+    """
+    if compression == "raw":
+        return memoryview(np.ascontiguousarray(image)).cast("B")
+    if compression == "zlib":
+        return zlib.compress(np.ascontiguousarray(image), 1)
+    if compression == "jpeg":
+        buffer = io.BytesIO()
+        _require_pillow().fromarray(image).save(buffer, format="JPEG", quality=jpeg_quality)
+        return buffer.getbuffer()
+    raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}.")
+
+
+def decompress_frame(data, shape: List[int], dtype: str, compression: str) -> np.ndarray:
+    """
+    Decode ``CameraFrame.data`` back into an image array.
+
+    Uncompressed frames are returned as a read-only view of ``data``
+    without copying.
+
+    Args:
+        data: The received pixel bytes.
+        shape (List[int]): Shape of the original array.
+        dtype (str): NumPy dtype string of the original array.
+        compression (str): The compression the frame was sent with.
+
+    Returns:
+        np.ndarray: The decoded frame.
+    """
+    if compression == "raw":
+        return np.frombuffer(data, dtype=dtype).reshape(shape)
+    if compression == "zlib":
+        return np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape)
+    if compression == "jpeg":
+        return np.asarray(_require_pillow().open(io.BytesIO(data)))
+    raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}.")
+
+
+class CameraPublisher:
+    """
+    Publish the frames of one camera stream of a ``DeviceClient``.
+
+    Frames can be pushed with ``publish`` or pulled from a provider by a
+    background thread started with ``start``.
+    """
+
+    def __init__(self, client, stream: str = "main", compression: str = "raw",
+                 jpeg_quality: int = 85, chunk_size: int = 1024 * 1024):
+        """
+        Initialize a publisher on the client's session.
+
+        Args:
+            client (DeviceClient): The device the camera belongs to.
+            stream (str): Name of the stream, unique per device.
+            compression (str): One of ``"raw"``, ``"zlib"`` or ``"jpeg"``.
+            jpeg_quality (int): JPEG quality from 1 to 95.
+            chunk_size (int): Maximum number of pixel bytes per message.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}.")
+        if compression == "jpeg":
+            _require_pillow()
+        self.client = client
+        self.stream = stream
+        self.compression = compression
+        self.jpeg_quality = jpeg_quality
+        self.chunk_size = chunk_size
+        self.zone = None
+        self.publisher = None
+        self._declare_publisher()
+        self.encoder = msgspec.msgpack.Encoder()
+        self._seq = 0
+        # ``_seq`` numbers frames; the header sequence numbers every chunk.
+        self._message_seq = 0
+        self._running = threading.Event()
+        self._thread = None
+        print(f"[{client.device_id}] Camera stream '{stream}' on '{self.key}' ({compression})")
+
+    def _declare_publisher(self):
+        """(Re)declare the publisher in the client's current zone."""
+        if self.publisher is not None:
+            self.publisher.undeclare()
+        self.zone = self.client.zone
+        self.key = device_key(CAMERAS, self.zone, self.client.device_id, self.stream)
+        # Late frames are worthless: drop them under congestion rather than
+        # blocking the camera, and skip batching delays. Frames go out at
+        # ``BULK`` priority, behind commands and telemetry.
+        self.publisher = self.client.session.declare_publisher(
+            self.key, congestion_control=zenoh.CongestionControl.DROP,
+            priority=BULK.priority, express=True)
+
+    def publish(self, image: np.ndarray):
+        """
+        Compress, chunk and publish one frame.
+
+        Args:
+            image (np.ndarray): The frame to send.
+        """
+        if self.client.zone != self.zone:
+            self._declare_publisher()
+        data = memoryview(compress_frame(image, self.compression, self.jpeg_quality))
+        chunk_count = max(1, -(-len(data) // self.chunk_size))
+        writer = self.client.shm_writer
+        if writer is not None:
+            # Keep every chunk of the frame in the ring until it is sent.
+            writer.reserve(chunk_count)
+        stamp = time.time()
+        self._seq += 1
+        for index in range(chunk_count):
+            chunk = CameraFrame(
+                stream=self.stream,
+                seq=self._seq,
+                stamp=stamp,
+                shape=list(image.shape),
+                dtype=image.dtype.str,
+                compression=self.compression,
+                chunk_index=index,
+                chunk_count=chunk_count,
+                data=data[index * self.chunk_size:(index + 1) * self.chunk_size],
+            )
+            payload = self.encoder.encode(chunk)
+            self._message_seq += 1
+            header = encode_header(self._message_seq, stamp)
+            if writer is not None and len(payload) >= self.client.shm_threshold_bytes:
+                self.publisher.put(encode_ref(writer.write(payload)), encoding=SHM_ENCODING,
+                                   attachment=header)
+            else:
+                self.publisher.put(payload, attachment=header)
+
+    def start(self, frame_provider: Callable, fps: float):
+        """
+        Publish frames from ``frame_provider`` at a fixed rate.
+
+        Args:
+            frame_provider (Callable): Function returning the next frame, or
+                ``None`` to skip a period.
+            fps (float): Frames published per second.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._running.clear()
+        self._thread = threading.Thread(
+            target=self._capture_loop, args=(frame_provider, 1.0 / fps), daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self, frame_provider: Callable, period: float):
+        """Publish one frame per period until stopped."""
+        next_frame = time.monotonic()
+        while not self._running.is_set():
+            try:
+                image = frame_provider()
+                if image is not None:
+                    self.publish(image)
+            except Exception as e:
+                print(f"[{self.client.device_id}] Camera '{self.stream}' error: {e}")
+            next_frame += period
+            now = time.monotonic()
+            if next_frame < now:
+                next_frame = now
+            self._running.wait(next_frame - now)
+
+    def close(self):
+        """Stop the capture thread, if any, and undeclare the publisher."""
+        self._running.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.publisher.undeclare()
+        except Exception as e:
+            print(f"[{self.client.device_id}] Error closing camera '{self.stream}': {e}")
+
+
+@dataclass
+class Frame:
+    """
+    A decoded camera frame.
+
+    Attributes:
+        device_id (str): Device that published the frame.
+        stream (str): Name of the stream.
+        seq (int): Frame sequence number within the stream.
+        stamp (float): Capture time on the publisher (seconds since epoch).
+        image (np.ndarray): The pixels.
+    """
+    device_id: str
+    stream: str
+    seq: int
+    stamp: float
+    image: np.ndarray
+
+
+@dataclass
+class StreamStats:
+    """
+    Reception statistics of one camera stream.
+
+    Attributes:
+        fps (float): Recent rate of completed frames.
+        latency_seconds (float): Recent mean capture-to-receive latency.
+            Assumes the publisher and subscriber clocks are synchronized.
+        frames (int): Frames completely received.
+        dropped (int): Frames discarded because a newer one arrived first,
+            including incomplete frames.
+    """
+    fps: float = 0.0
+    latency_seconds: float = 0.0
+    frames: int = 0
+    dropped: int = 0
+
+
+class _StreamState:
+    """Reassembly buffer and statistics of a single stream."""
+
+    def __init__(self, window: int, queue_size: int):
+        self.seq = -1
+        self.chunks: Dict[int, CameraFrame] = {}
+        self.last_complete = -1
+        self.last_stamp = 0.0
+        self.arrivals = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.frames = 0
+        self.dropped = 0
+        # Completed frames waiting for ``get``, as chunk dicts.
+        self.ready = deque(maxlen=queue_size)
+
+
+class CameraSubscriber:
+    """
+    Receive camera frames with drop-oldest semantics.
+
+    Each stream keeps its completed frames in its own bounded queue; when
+    it is full the stream's oldest frame is discarded, so a busy camera
+    never evicts the frames of another. ``get`` takes frames from the
+    streams in turn. Frames are only decompressed when taken, so dropped
+    frames cost no decoding.
+    """
+
+    def __init__(self, device_id: str = "*", stream: str = "*", queue_size: int = 1,
+                 stats_window: int = 30, zone: str = "*"):
+        """
+        Subscribe to one or many camera streams.
+
+        Args:
+            device_id (str): Device to receive from; ``"*"`` for all.
+            stream (str): Stream to receive; ``"*"`` for all.
+            queue_size (int): Number of completed frames buffered per stream.
+            stats_window (int): Number of recent frames used for statistics.
+            zone (str): Only receive from devices in this zone; ``"*"`` for all.
+        """
+        self.session = zenoh.open(Config())
+        self.decoder = msgspec.msgpack.Decoder(CameraFrame)
+        self._queue_size = queue_size
+        # Keys of the streams with frames ready, in the order ``get`` visits them.
+        self._ready_streams = deque()
+        self._cond = threading.Condition()
+        self._streams: Dict[str, _StreamState] = {}
+        self._stats_window = stats_window
+        selector = device_key(CAMERAS, zone, device_id, stream)
+        self.subscriber = self.session.declare_subscriber(selector, self._frame_callback)
+        print(f"[Navis API] Subscribed to camera streams on '{selector}'")
+
+    def _frame_callback(self, sample):
+        """Reassemble chunks and queue completed frames."""
+        try:
+            chunk = decode_payload(sample, self.decoder.decode)
+            if is_shm_sample(sample):
+                # The chunk is a view of a shared-memory slot, which the
+                # publisher reuses while the frame waits to be completed
+                # and taken; keep a copy instead.
+                chunk.data = memoryview(bytes(chunk.data))
+        except Exception as e:
+            print(f"[Navis API] Failed to decode camera frame on '{sample.key_expr}': {e}")
+            return
+        # Streams are keyed without their zone so a device can change zone
+        # without resetting reassembly and statistics.
+        _, _, device_id, stream = parse_key(sample.key_expr)
+        key = f"{device_id}/{stream}"
+        received = time.time()
+        with self._cond:
+            state = self._streams.get(key)
+            if state is None:
+                state = self._streams[key] = _StreamState(self._stats_window, self._queue_size)
+            if chunk.seq <= state.last_complete:
+                if chunk.seq != 1 and chunk.stamp <= state.last_stamp:
+                    return  # Late chunk of an older frame.
+                # The publisher restarted and began a new sequence.
+                state.last_complete = -1
+            if chunk.seq != state.seq:
+                if state.chunks:
+                    state.dropped += 1
+                state.seq = chunk.seq
+                state.chunks = {}
+            state.chunks[chunk.chunk_index] = chunk
+            if len(state.chunks) < chunk.chunk_count:
+                return
+
+            chunks, state.chunks = state.chunks, {}
+            state.last_complete = chunk.seq
+            state.last_stamp = chunk.stamp
+            state.frames += 1
+            state.arrivals.append(received)
+            state.latencies.append(received - chunk.stamp)
+            if not state.ready:
+                self._ready_streams.append(key)
+            elif len(state.ready) == state.ready.maxlen:
+                state.dropped += 1
+            state.ready.append(chunks)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        Take a frame, waiting for one if needed.
+
+        Streams with frames ready take turns; each returns its oldest
+        queued frame.
+
+        Uncompressed single-chunk frames are read-only views of the
+        received buffer.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds;
+                ``None`` waits forever.
+
+        Returns:
+            Frame | None: The frame, or ``None`` on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready_streams, timeout):
+                return None
+            key = self._ready_streams.popleft()
+            ready = self._streams[key].ready
+            chunks = ready.popleft()
+            if ready:
+                self._ready_streams.append(key)
+
+        first = chunks[0]
+        if first.chunk_count == 1:
+            data = first.data
+        else:
+            data = b"".join(chunks[i].data for i in range(first.chunk_count))
+        image = decompress_frame(data, first.shape, first.dtype, first.compression)
+        device_id = key.split("/", 1)[0]
+        return Frame(device_id=device_id, stream=first.stream, seq=first.seq,
+                     stamp=first.stamp, image=image)
+
+    def stats(self) -> Dict[str, StreamStats]:
+        """
+        Return reception statistics per stream.
+
+        Returns:
+            Dict[str, StreamStats]: Mapping of ``<device_id>/<stream>`` -> statistics.
+        """
+        result = {}
+        with self._cond:
+            for key, state in self._streams.items():
+                fps = 0.0
+                if len(state.arrivals) > 1:
+                    span = state.arrivals[-1] - state.arrivals[0]
+                    fps = (len(state.arrivals) - 1) / span if span > 0 else 0.0
+                latency = sum(state.latencies) / len(state.latencies) if state.latencies else 0.0
+                result[key] = StreamStats(fps=fps, latency_seconds=latency,
+                                          frames=state.frames, dropped=state.dropped)
+        return result
+
+    def close(self):
+        """Undeclare the subscriber and close the Zenoh session."""
+        try:
+            self.subscriber.undeclare()
+            self.session.close()
+        except Exception as e:
+            print(f"[Navis API] Error closing camera subscriber: {e}")
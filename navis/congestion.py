@@ -0,0 +1,197 @@
+"""
+Navis Congestion Control
+========================
+
+Priority classes and send-side rate adaptation for Navis publishers.
+
+When the network saturates, publishing everything at its configured rate
+only grows queues, and every topic's latency suffers. Instead:
+
+    - Each publisher belongs to a ``PriorityClass``, mapped to a Zenoh
+      priority and congestion-control policy, so transports serve control
+      traffic before telemetry and drop bulk data first.
+    - Senders feed the time each ``put`` takes, and the round-trip time of
+      acknowledged commands where available, to a ``CongestionMonitor``.
+    - Adaptive publishers back off multiplicatively while congestion is
+      detected and recover additively once it clears (AIMD), between their
+      configured minimum and maximum intervals.
+
+Zenoh does not report dropped samples to Python. With the ``DROP`` policy a
+``put`` on full transmission queues waits up to ``wait_before_drop``
+(1 ms by default) before dropping, so drops show up as put latency.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Union
+
+import zenoh
+
+# Default ratio between the slowest and fastest interval of adaptive tasks.
+DEFAULT_BACKOFF_RANGE = 4.0
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    """
+    How the traffic of a publisher is treated by Zenoh and by rate adaptation.
+
+    Attributes:
+        name (str): Name of the class.
+        priority (zenoh.Priority): Zenoh priority of the samples.
+        congestion_control (zenoh.CongestionControl): Whether to block or
+            drop when transmission queues are full.
+        express (bool): Send samples without batching.
+        adaptive (bool): Whether publishers of this class back off under
+            congestion.
+    """
+    name: str
+    priority: zenoh.Priority
+    congestion_control: zenoh.CongestionControl
+    express: bool
+    adaptive: bool
+
+
+# Commands and setpoints: never slowed down, never dropped.
+CONTROL = PriorityClass("control", zenoh.Priority.INTERACTIVE_HIGH,
+                        zenoh.CongestionControl.BLOCK, express=True, adaptive=False)
+# ``register`` announcements: ahead of telemetry, but only needed now and then.
+DISCOVERY = PriorityClass("discovery", zenoh.Priority.DATA_HIGH,
+                          zenoh.CongestionControl.DROP, express=False, adaptive=True)
+# Measurements and state.
+TELEMETRY = PriorityClass("telemetry", zenoh.Priority.DATA,
+                          zenoh.CongestionControl.DROP, express=False, adaptive=True)
+# Large payloads such as camera frames and maps.
+BULK = PriorityClass("bulk", zenoh.Priority.DATA_LOW,
+                     zenoh.CongestionControl.DROP, express=False, adaptive=True)
+
+PRIORITY_CLASSES = {c.name: c for c in (CONTROL, DISCOVERY, TELEMETRY, BULK)}
+
+
+def priority_class(priority: Union[str, PriorityClass]) -> PriorityClass:
+    """
+    Resolve a priority class given by name.
+
+    Args:
+        priority (str | PriorityClass): A class, or the name of one of
+            ``PRIORITY_CLASSES``.
+
+    Returns:
+        PriorityClass: The priority class.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(priority, PriorityClass):
+        return priority
+    try:
+        return PRIORITY_CLASSES[priority]
+    except KeyError:
+        raise ValueError(f"Unknown priority class '{priority}', expected one of "
+                         f"{sorted(PRIORITY_CLASSES)}") from None
+
+
+def adapt_interval(interval: float, min_interval: float, max_interval: float, congested: bool,
+                   backoff: float = 2.0, recovery: float = 0.05) -> float:
+    """
+    Compute the next publish interval of an adaptive task.
+
+    Under congestion the rate is divided by ``backoff``; otherwise it grows
+    by ``recovery`` times the span between the slowest and fastest rates.
+
+    Args:
+        interval (float): Current interval in seconds.
+        min_interval (float): Fastest allowed interval.
+        max_interval (float): Slowest allowed interval.
+        congested (bool): Whether congestion is currently detected.
+        backoff (float): Multiplicative decrease of the rate.
+        recovery (float): Additive increase of the rate, as a fraction of
+            the allowed span.
+
+    Returns:
+        float: The new interval, between ``min_interval`` and ``max_interval``.
+    """
+    if congested:
+        return min(interval * backoff, max_interval)
+    rate = 1.0 / interval + recovery * (1.0 / min_interval - 1.0 / max_interval)
+    return max(1.0 / rate, min_interval)
+
+
+class CongestionMonitor:
+    """
+    Detect congestion from send-side latency signals.
+
+    The monitor keeps exponentially weighted averages of put latency and
+    of command round-trip time. The network is considered congested when
+    puts take longer than ``put_latency_threshold`` on average, or when the
+    average round-trip time exceeds ``rtt_factor`` times the lowest one
+    observed (plus ``rtt_margin``). The round-trip signal only counts for
+    ``rtt_window`` seconds after the last acknowledged command, so it does
+    not keep publishers backed off once commands stop. Thread-safe; share
+    one monitor between all publishers using the same link.
+    """
+
+    def __init__(self, put_latency_threshold: float = 0.0005, rtt_factor: float = 2.0,
+                 rtt_margin: float = 0.002, smoothing: float = 0.1, rtt_window: float = 5.0):
+        """
+        Initialize a monitor with no samples.
+
+        Args:
+            put_latency_threshold (float): Average put duration, in seconds,
+                above which the network is considered congested.
+            rtt_factor (float): Ratio between the average and the minimum
+                round-trip time above which the network is considered congested.
+            rtt_margin (float): Slack in seconds added to the round-trip
+                threshold, so that jitter on very fast links is ignored.
+            smoothing (float): Weight of each new sample in the averages.
+            rtt_window (float): Seconds after the last round-trip sample
+                during which the round-trip average is trusted. A sample
+                arriving later restarts the average.
+        """
+        self.put_latency_threshold = put_latency_threshold
+        self.rtt_factor = rtt_factor
+        self.rtt_margin = rtt_margin
+        self.smoothing = smoothing
+        self.rtt_window = rtt_window
+        self.put_latency = 0.0
+        self.rtt = None
+        self.min_rtt = None
+        self._last_rtt_time = 0.0
+        self._lock = threading.Lock()
+
+    def record_put(self, seconds: float):
+        """
+        Add the duration of one ``put``.
+
+        Args:
+            seconds (float): Time spent in the put call.
+        """
+        with self._lock:
+            self.put_latency += self.smoothing * (seconds - self.put_latency)
+
+    def record_rtt(self, seconds: float):
+        """
+        Add the round-trip time of one acknowledged command.
+
+        Args:
+            seconds (float): Time from sending to acknowledgement.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.rtt is None or now - self._last_rtt_time > self.rtt_window:
+                self.rtt = seconds
+            else:
+                self.rtt += self.smoothing * (seconds - self.rtt)
+            self._last_rtt_time = now
+            if self.min_rtt is None or seconds < self.min_rtt:
+                self.min_rtt = seconds
+
+    @property
+    def congested(self) -> bool:
+        """Whether the latency signals currently indicate congestion."""
+        with self._lock:
+            if self.put_latency > self.put_latency_threshold:
+                return True
+            return (self.rtt is not None
+                    and time.monotonic() - self._last_rtt_time <= self.rtt_window
+                    and self.rtt > self.rtt_factor * self.min_rtt + self.rtt_margin)
@@ -23,6 +23,7 @@ import time
 
 from navis.api import DeviceClient, DeviceInterface
 from navis.messages import Move, Measurement, DifferentialDriveState
+from navis.prediction import DeadbandFilter
 
 
 class SimulatedRobot(DeviceInterface):
@@ -98,11 +99,13 @@ def main():
             additional_messages=[]
         )
 
-        # 3. Register a publisher for the measurement data.
+        # 3. Register a publisher for the measurement data. It is sampled
+        # every 0.1s but only sent when consumers could not predict it.
         client.add_publisher(
             topic_suffix="measurement",
             data_provider=device_logic.get_measurement,
-            interval_seconds=0.1
+            interval_seconds=0.1,
+            deadband=DeadbandFilter(position_tolerance=0.05)
         )
 
         # 4. Start the client's background threads.
@@ -9,9 +9,10 @@ This script automatically discovers the robot to control. It polls the
 network for a few seconds and will only run if it finds exactly one robot.
 """
 import sys
-import time
+import threading
 import navis
 from navis.categories import ROBOTS
+from navis.trajectory import velocity_trajectory
 
 
 def scripted_moves(controller: navis.DeviceController):
@@ -34,13 +35,28 @@ def scripted_moves(controller: navis.DeviceController):
         (3.0, 0.0, 3),   # Forward for 3s
     ]
 
-    for v, omega, duration in path:
-        print(f"[CONTROL] Sending v={v:.1f}, ω={omega:.1f} for {duration}s")
-        controller.move(linear_vel=v, angular_vel=omega)
-        time.sleep(duration)
+    # The whole path is uploaded as one trajectory: the robot times each
+    # segment on its own clock, whatever the link does in the meantime.
+    trajectory = velocity_trajectory(path)
+    finished = threading.Event()
 
-    print("[CONTROL] Path finished. Stopping robot.")
-    controller.move(linear_vel=0.0, angular_vel=0.0)
+    def on_progress(progress):
+        print(f"[CONTROL] Trajectory {progress.status}: "
+              f"{progress.completed}/{progress.total} segments, {progress.elapsed:.1f}s")
+        if progress.status != "running":
+            finished.set()
+
+    controller.on_trajectory_progress(on_progress)
+    result = controller.send_trajectory(trajectory).result()
+    if not result.ok:
+        print(f"[ERROR] Robot rejected the trajectory: {result.error}")
+        return
+    print(f"[CONTROL] Trajectory accepted in {result.rtt_seconds * 1e3:.1f} ms")
+    # The path ends at its last waypoint; allow some slack for the final report.
+    if finished.wait(trajectory.waypoints[-1].t + 5.0):
+        print("[CONTROL] Path finished.")
+    else:
+        print("[CONTROL] No final report from the robot; assuming the path finished.")
 
 
 if __name__ == "__main__":
@@ -71,6 +87,7 @@ if __name__ == "__main__":
         scripted_moves(controller)
     except KeyboardInterrupt:
         print("\n[CONTROL] Script interrupted by user. Stopping robot.")
+        controller.cancel_trajectory()
         controller.move(linear_vel=0.0, angular_vel=0.0)
     finally:
         print("[CONTROL] Shutting down controller.")
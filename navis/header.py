@@ -0,0 +1,65 @@
+"""
+Navis Message Header
+====================
+
+Source timestamp and sequence number attached to every Navis message.
+
+The header travels in the Zenoh attachment of a sample or query, so it
+applies to any message type (including user-defined commands) without
+changing message schemas, and consumers that ignore it are unaffected.
+
+The timestamp is the sender's wall clock (``time.time()``). Latency and
+age computed across hosts are only as accurate as the clock
+synchronization between them (NTP/PTP).
+"""
+import struct
+import time
+from typing import NamedTuple, Optional
+
+HEADER_VERSION = 1
+_HEADER = struct.Struct("<BdQ")
+
+
+class Header(NamedTuple):
+    """
+    Decoded message header.
+
+    Attributes:
+        stamp (float): Source time in seconds since the epoch.
+        seq (int): Per-topic sequence number, starting at 1.
+    """
+    stamp: float
+    seq: int
+
+
+def encode_header(seq: int, stamp: float = None) -> bytes:
+    """
+    Build the attachment for an outgoing message.
+
+    Args:
+        seq (int): Sequence number of the message on its topic.
+        stamp (float, optional): Source time; defaults to now.
+
+    Returns:
+        bytes: The encoded header.
+    """
+    return _HEADER.pack(HEADER_VERSION, time.time() if stamp is None else stamp, seq)
+
+
+def decode_header(attachment) -> Optional[Header]:
+    """
+    Read the header of an incoming sample or query.
+
+    Args:
+        attachment (zenoh.ZBytes | None): The ``attachment`` of the sample.
+
+    Returns:
+        Header | None: The header, or ``None`` if the message has none.
+    """
+    if attachment is None:
+        return None
+    data = attachment.to_bytes()
+    if len(data) != _HEADER.size or data[0] != HEADER_VERSION:
+        return None
+    _, stamp, seq = _HEADER.unpack(data)
+    return Header(stamp=stamp, seq=seq)
@@ -0,0 +1,338 @@
+"""
+Navis Device Host
+=================
+
+Run many devices in one process on a single Zenoh session.
+
+A ``DeviceClient`` owns a session, a command subscriber and a publishing
+thread, which is fine for one robot but not for a gateway bridging
+thousands of PLC-driven devices. ``DeviceHost`` registers any number of
+``DeviceInterface`` objects and shares everything between them:
+
+    - IDs are leased from the ID service in bulk.
+    - One wildcard subscriber (and one queryable, for acknowledged
+      commands) receives the commands of every hosted device and dispatches
+      them through a dict keyed on device ID.
+    - Publisher tasks, zone changes, command dispatch and trajectory
+      execution share their implementation with ``DeviceClient``.
+    - One ``TimerWheel`` thread drives the publisher tasks of all devices,
+      which back off together when the shared ``CongestionMonitor``
+      reports congestion.
+
+Per-device state is a couple of small slotted objects, so hosting a device
+costs a few kilobytes.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+import msgspec
+import zenoh
+
+from navis.api import (
+    DeviceInterface,
+    PublisherTask,
+    answer_command_query,
+    build_command,
+    device_trajectory_executor,
+    dispatch_device_command,
+    is_stale_command,
+    lease_ids,
+    publish_task_sample,
+    relocate_tasks,
+)
+from navis.categories import ROBOTS
+from navis.congestion import (
+    DISCOVERY,
+    TELEMETRY,
+    CongestionMonitor,
+    PriorityClass,
+    priority_class,
+)
+from navis.mesh import session_config
+from navis.messages import CancelTrajectory, Move, Register, Trajectory
+from navis.prediction import DeadbandFilter
+from navis.scheduler import TimerWheel
+from navis.trajectory import TrajectoryExecutor
+from navis.transport import decode_payload
+from navis.zones import DEFAULT_ZONE, ZoneMap, device_key, parse_key, selector
+
+
+class _HostedDevice:
+    """Per-device state kept by a ``DeviceHost``."""
+    __slots__ = ("device", "device_id", "zone", "zone_map", "tasks", "trajectories")
+
+    def __init__(self, device: DeviceInterface, device_id: str, zone: str,
+                 zone_map: Optional[ZoneMap]):
+        self.device = device
+        self.device_id = device_id
+        self.zone = zone
+        self.zone_map = zone_map
+        self.tasks: List[PublisherTask] = []
+        self.trajectories: Optional[TrajectoryExecutor] = None
+
+
+class DeviceHost:
+    """
+    Host many Navis devices on one session, subscriber and scheduler.
+
+    Devices behave as if each had its own ``DeviceClient``: they get a
+    unique ID, announce themselves on ``register``, publish their periodic
+    topics, receive the commands sent by ``DeviceController`` and execute
+    its trajectories.
+    """
+
+    def __init__(self, category: str = ROBOTS, additional_messages: List[type] = None,
+                 tick_seconds: float = 0.01, max_command_age: float = None,
+                 congestion: CongestionMonitor = None, router: str = None):
+        """
+        Initialize a host with no devices.
+
+        ``self.stale_commands`` counts the commands discarded by
+        ``max_command_age``, across all hosted devices.
+
+        Args:
+            category (str): Category of the hosted devices (e.g., ``ROBOTS``).
+            additional_messages (List[type], optional): Additional command
+                types to register, shared by all hosted devices.
+            tick_seconds (float): Resolution of the shared publish scheduler.
+            max_command_age (float, optional): Discard ``Move`` commands whose
+                source timestamp is older than this many seconds.
+            congestion (CongestionMonitor, optional): Congestion signals the
+                publish rates of all hosted devices adapt to.
+            router (str, optional): Router to connect to: an endpoint, or
+                ``"auto"`` for the least-loaded router of the mesh.
+        """
+        self.category = category
+        self.max_command_age = max_command_age
+        self.stale_commands = 0
+        self.congestion = congestion if congestion is not None else CongestionMonitor()
+        self.session = zenoh.open(session_config(router))
+        self.encoder = msgspec.msgpack.Encoder()
+        self.decoder = msgspec.msgpack.Decoder()
+        self.command_registry = {'Move': Move, 'Trajectory': Trajectory,
+                                 'CancelTrajectory': CancelTrajectory}
+        if additional_messages:
+            for msg_type in additional_messages:
+                self.command_registry[msg_type.__name__] = msg_type
+
+        self.devices: Dict[str, _HostedDevice] = {}
+        self._devices_lock = threading.Lock()
+        self.wheel = TimerWheel(tick_seconds=tick_seconds)
+        self._running = threading.Event()
+        self._thread = None
+        self._subscriber = None
+        self._queryable = None
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def register(self, device_object: DeviceInterface, zone: str = DEFAULT_ZONE,
+                 zone_map: ZoneMap = None) -> str:
+        """
+        Host a single device.
+
+        Args:
+            device_object (DeviceInterface): Object implementing ``dispatch_command``.
+            zone (str): Initial zone of the device.
+            zone_map (ZoneMap, optional): Zones to migrate between as the
+                device's published ``x``/``y`` position changes.
+
+        Returns:
+            str: The ID assigned to the device.
+        """
+        return self.register_many([device_object], zone=zone, zone_map=zone_map)[0]
+
+    def register_many(self, device_objects: List[DeviceInterface], zone: str = DEFAULT_ZONE,
+                      zone_map: ZoneMap = None) -> List[str]:
+        """
+        Host several devices, leasing their IDs in a single request.
+
+        Each device gets a ``register`` publisher every 5 seconds, like a
+        ``DeviceClient``.
+
+        Args:
+            device_objects (List[DeviceInterface]): Objects implementing
+                ``dispatch_command``.
+            zone (str): Initial zone of the devices.
+            zone_map (ZoneMap, optional): Zones to migrate between, shared by
+                the devices.
+
+        Returns:
+            List[str]: The assigned IDs, in the order of ``device_objects``.
+        """
+        for device_object in device_objects:
+            if not callable(getattr(device_object, "dispatch_command", None)):
+                raise TypeError(
+                    "device_object must implement a callable ``dispatch_command(command)`` method.")
+
+        device_ids = lease_ids(self.session, len(device_objects))
+        for device_object, device_id in zip(device_objects, device_ids):
+            hosted = _HostedDevice(device_object, device_id, zone, zone_map)
+            hosted.trajectories = device_trajectory_executor(
+                device_object, self.session, self.encoder,
+                lambda hosted=hosted: device_key(self.category, hosted.zone, hosted.device_id,
+                                                 "trajectory"),
+                f"Host:{device_id}")
+            with self._devices_lock:
+                self.devices[device_id] = hosted
+            self.add_publisher(device_id, "register",
+                               lambda device_id=device_id: Register(robot_id=device_id), 5.0,
+                               priority=DISCOVERY)
+        print(f"[Host] Registered {len(device_ids)} devices ({len(self.devices)} hosted)")
+        return device_ids
+
+    def unregister(self, device_id: str):
+        """
+        Stop hosting a device: cancel its publishers and ignore its commands.
+
+        Args:
+            device_id (str): ID of the hosted device.
+        """
+        with self._devices_lock:
+            hosted = self.devices.pop(device_id, None)
+        if hosted is None:
+            return
+        for task in hosted.tasks:
+            if task.timer is not None:
+                task.timer.cancel()
+        hosted.trajectories.close()
+
+    def add_publisher(self, device_id: str, topic_suffix: str, data_provider: Callable,
+                      interval_seconds: float, max_interval_seconds: float = None,
+                      priority: Union[str, PriorityClass] = TELEMETRY,
+                      deadband: DeadbandFilter = None):
+        """
+        Register a periodic publisher task for a hosted device.
+
+        Args:
+            device_id (str): ID of the hosted device.
+            topic_suffix (str): Suffix for the Zenoh topic.
+            data_provider (Callable): Function providing the data.
+            interval_seconds (float): Publish interval in seconds when the
+                network is clear.
+            max_interval_seconds (float, optional): Slowest publish interval
+                under congestion; see ``PublisherTask``.
+            priority (str | PriorityClass): Priority class of the topic.
+            deadband (DeadbandFilter, optional): Only send measurements
+                consumers cannot predict; see ``DeviceClient.add_publisher``.
+        """
+        hosted = self.devices[device_id]
+        task = PublisherTask(
+            topic_suffix=topic_suffix, data_provider=data_provider,
+            interval_seconds=interval_seconds, max_interval_seconds=max_interval_seconds,
+            priority=priority_class(priority), deadband=deadband,
+            topic=device_key(self.category, hosted.zone, device_id, topic_suffix))
+        hosted.tasks.append(task)
+        # Publish right away, as ``DeviceClient`` does on start.
+        self._schedule(hosted, task, 0)
+
+    def _schedule(self, hosted: _HostedDevice, task: PublisherTask, delay: float):
+        """(Re)schedule the next run of a task."""
+        if task.timer is not None:
+            task.timer.cancel()
+        task.timer = self.wheel.schedule(delay, lambda: self._run_task(hosted, task))
+
+    def _run_task(self, hosted: _HostedDevice, task: PublisherTask):
+        """Publish one sample of a task and schedule its next run."""
+        if hosted.device_id not in self.devices:
+            return
+        try:
+            publish_task_sample(
+                task, self.encoder, self._put,
+                None if hosted.zone_map is None else
+                lambda x, y: self._update_zone(hosted, x, y))
+        except Exception as e:
+            print(f"[Host:{hosted.device_id}] Publisher error on topic {task.topic}: {e}")
+        task.adapt(self.congestion.congested)
+        task.timer = self.wheel.schedule(task.current_interval,
+                                         lambda: self._run_task(hosted, task))
+
+    def _put(self, task: PublisherTask, payload: bytes, attachment: bytes):
+        """Put a task's sample on the shared session, with its class's QoS."""
+        priority = task.priority
+        start = time.perf_counter()
+        self.session.put(task.topic, payload, attachment=attachment, priority=priority.priority,
+                         congestion_control=priority.congestion_control, express=priority.express)
+        self.congestion.record_put(time.perf_counter() - start)
+
+    def _update_zone(self, hosted: _HostedDevice, x: float, y: float):
+        """Move a device's publishers to the zone containing ``(x, y)``, if it changed."""
+        hosted.zone = relocate_tasks(hosted.tasks, self.category, hosted.device_id, hosted.zone,
+                                     hosted.zone_map, x, y,
+                                     lambda task: self._schedule(hosted, task, 0))
+
+    def _dispatch(self, hosted: _HostedDevice, cmd: msgspec.Struct):
+        """Hand a command to the device's trajectory executor or the device."""
+        dispatch_device_command(cmd, hosted.device, hosted.trajectories,
+                                f"Host:{hosted.device_id}")
+
+    def _command_callback(self, sample):
+        """
+        Route an incoming command to the hosted device it is addressed to.
+
+        Args:
+            sample: Zenoh sample containing the command message.
+        """
+        try:
+            _, _, device_id, _ = parse_key(sample.key_expr)
+            hosted = self.devices.get(device_id)
+            if hosted is None:
+                return  # Addressed to a device hosted elsewhere.
+            data = decode_payload(sample, self.decoder.decode)
+            cmd = build_command(data, self.command_registry)
+            if is_stale_command(cmd, sample.attachment, self.max_command_age):
+                self.stale_commands += 1
+                print(f"[Host:{device_id}] Discarded stale command: {type(cmd).__name__}")
+                return
+            self._dispatch(hosted, cmd)
+        except Exception as e:
+            print(f"[Host] Command error on '{sample.key_expr}': {e}")
+
+    def _command_query_callback(self, query):
+        """
+        Route an acknowledged command to its hosted device and reply.
+
+        Args:
+            query: Zenoh query containing the command message.
+        """
+        try:
+            _, _, device_id, _ = parse_key(query.key_expr)
+        except ValueError as e:
+            print(f"[Host] Command error: {e}")
+            return
+        hosted = self.devices.get(device_id)
+        if hosted is None:
+            return  # Addressed to a device hosted elsewhere.
+        ack = answer_command_query(query, lambda cmd: self._dispatch(hosted, cmd), self.decoder,
+                                   self.command_registry, self.encoder, self.max_command_age)
+        if ack.status == "stale":
+            self.stale_commands += 1
+            print(f"[Host:{device_id}] Discarded stale command")
+        elif ack.status == "error":
+            print(f"[Host:{device_id}] Command error: {ack.error}")
+
+    def start(self):
+        """Start the shared scheduler and subscribe to the commands of all devices."""
+        if self._thread and self._thread.is_alive():
+            return
+        command_selector = selector(self.category, "*", "*", "commands")
+        print(f"[Host] Starting {len(self.devices)} devices, commands on '{command_selector}'")
+        self._running.clear()
+        self._subscriber = self.session.declare_subscriber(command_selector, self._command_callback)
+        self._queryable = self.session.declare_queryable(command_selector, self._command_query_callback)
+        self._thread = threading.Thread(target=self.wheel.run, args=(self._running,), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the scheduler and close the shared Zenoh session."""
+        print(f"[Host] Closing ({len(self.devices)} devices)...")
+        for hosted in list(self.devices.values()):
+            hosted.trajectories.close()
+        self._running.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.session.close()
+        except Exception as e:
+            print(f"[Host] Error closing session: {e}")
@@ -0,0 +1,236 @@
+"""
+Navis Router Mesh
+=================
+
+Configuration of a mesh of Zenoh routers, and router selection for devices.
+
+A single router caps how many devices a deployment can serve. A mesh
+spreads devices over several routers connected to each other, so samples
+between devices on the same router never leave it while the rest are
+forwarded across the mesh.
+
+Key abstractions:
+    - ``RouterNode``: One router of the mesh and its generated configuration.
+    - ``local_mesh``: Nodes for a mesh of router processes on one host,
+      for testing and load tests.
+    - ``select_router``: Pick the nearest or least-loaded router of a mesh,
+      from the router admin space.
+    - ``session_config``: Zenoh configuration connecting to a chosen router.
+
+``navis-router`` launches and supervises the nodes (see ``navis.router``).
+"""
+import json
+import signal
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import zenoh
+from zenoh import Config
+
+DEFAULT_PORT = 7447
+
+
+@dataclass
+class RouterNode:
+    """
+    One router of a mesh.
+
+    Attributes:
+        name (str): Name of the node, used in logs and config file names.
+        listen (List[str]): Endpoints the router listens on
+            (e.g., ``tcp/0.0.0.0:7447``).
+        connect (List[str]): Endpoints of the other routers it connects to.
+        partition (int): ID service partition of the node; must be unique
+            across the whole mesh.
+    """
+    name: str
+    listen: List[str]
+    connect: List[str] = field(default_factory=list)
+    partition: int = 0
+
+    @property
+    def endpoint(self) -> str:
+        """Endpoint local clients use to reach the router."""
+        return self.listen[0].replace("0.0.0.0", "127.0.0.1")
+
+    def config(self) -> Dict:
+        """
+        Return the router configuration of the node.
+
+        Returns:
+            Dict: JSON5-compatible ``zenohd`` configuration. The admin space
+                is readable so that clients can compare router loads.
+        """
+        return {
+            "mode": "router",
+            "metadata": {"name": self.name},
+            "listen": {"endpoints": list(self.listen)},
+            "connect": {"endpoints": list(self.connect)},
+            "adminspace": {"enabled": True, "permissions": {"read": True, "write": False}},
+        }
+
+    def write_config(self, path: str):
+        """
+        Write the node's configuration to a JSON5 file.
+
+        Args:
+            path (str): File to write.
+        """
+        with open(path, "w") as f:
+            json.dump(self.config(), f, indent=2)
+
+
+def local_mesh(count: int, base_port: int = DEFAULT_PORT, host: str = "127.0.0.1",
+               partition_offset: int = 0) -> List[RouterNode]:
+    """
+    Describe a fully connected mesh of routers on one host.
+
+    Router ``i`` listens on ``base_port + i`` and connects to every router
+    before it, so each pair of routers shares one link.
+
+    Args:
+        count (int): Number of routers.
+        base_port (int): Port of the first router.
+        host (str): Address the routers listen on.
+        partition_offset (int): ID service partition of the first router.
+            Give each host a distinct range when meshing several hosts.
+
+    Returns:
+        List[RouterNode]: The nodes of the mesh.
+    """
+    if count < 1:
+        raise ValueError("A mesh needs at least one router.")
+    endpoints = [f"tcp/{host}:{base_port + i}" for i in range(count)]
+    return [RouterNode(name=f"router-{i}", listen=[endpoints[i]], connect=endpoints[:i],
+                       partition=partition_offset + i)
+            for i in range(count)]
+
+
+def session_config(router: str = None) -> Config:
+    """
+    Return the Zenoh configuration of a device session.
+
+    Args:
+        router (str, optional): ``None`` for the default configuration
+            (discover routers by scouting), an endpoint such as
+            ``tcp/10.0.0.2:7447`` to connect to that router, ``"auto"`` to
+            connect to the least-loaded router found by ``select_router``, or
+            ``"nearest"`` for the router reached first by scouting.
+
+    Returns:
+        zenoh.Config: The session configuration.
+    """
+    if router is None:
+        return Config()
+    if router in ("auto", "nearest"):
+        router = select_router(policy="least_loaded" if router == "auto" else "nearest")
+    config = Config()
+    config.insert_json5("mode", '"client"')
+    config.insert_json5("connect/endpoints", json.dumps([router]))
+    return config
+
+
+def router_loads(session: zenoh.Session, timeout: float = 2.0) -> Dict[str, Dict]:
+    """
+    Read the load of every router reachable from a session.
+
+    Args:
+        session (zenoh.Session): Session connected to the mesh.
+        timeout (float): Time to wait for the admin space replies.
+
+    Returns:
+        Dict[str, Dict]: Mapping of router ZID -> ``{"name", "locators",
+            "clients"}``, where ``clients`` counts the client-mode sessions
+            (devices and services) attached to the router.
+    """
+    loads = {}
+    for reply in session.get("@/*/router", timeout=timeout):
+        if not reply.ok:
+            continue
+        try:
+            info = json.loads(reply.ok.payload.to_string())
+        except ValueError:
+            continue
+        sessions = info.get("sessions", [])
+        loads[info["zid"]] = {
+            "name": (info.get("metadata") or {}).get("name", info["zid"]),
+            "locators": [loc for loc in info.get("locators", []) if loc.startswith("tcp/")],
+            "clients": sum(1 for s in sessions if s.get("whatami") == "client"),
+        }
+    return loads
+
+
+def select_router(bootstrap: str = None, policy: str = "least_loaded",
+                  timeout: float = 2.0) -> str:
+    """
+    Pick the router of the mesh a device should connect to.
+
+    Args:
+        bootstrap (str, optional): Endpoint of any router of the mesh; by
+            default routers are discovered by scouting.
+        policy (str): ``"least_loaded"`` for the router with the fewest
+            attached sessions, or ``"nearest"`` for the router the bootstrap
+            session reached first.
+        timeout (float): Time to wait for the routers' replies.
+
+    Returns:
+        str: The endpoint of the chosen router.
+
+    Raises:
+        RuntimeError: If no router with a TCP locator replies.
+        ValueError: If the policy is unknown.
+    """
+    if policy not in ("least_loaded", "nearest"):
+        raise ValueError(f"Unknown router selection policy '{policy}'")
+    # A peer-mode session, so that it is not counted as a client itself.
+    config = Config()
+    if bootstrap is not None:
+        config.insert_json5("connect/endpoints", json.dumps([bootstrap]))
+    session = zenoh.open(config)
+    try:
+        loads = router_loads(session, timeout)
+        nearest = {str(zid) for zid in session.info.routers_zid()}
+    finally:
+        session.close()
+
+    candidates = {zid: load for zid, load in loads.items() if load["locators"]}
+    if not candidates:
+        raise RuntimeError("No Navis router found (is navis-router running?)")
+    if policy == "nearest":
+        reachable = [zid for zid in candidates if zid in nearest]
+        if reachable:
+            return candidates[reachable[0]]["locators"][0]
+    zid = min(candidates, key=lambda zid: (candidates[zid]["clients"], candidates[zid]["name"]))
+    print(f"[Navis API] Selected router '{candidates[zid]['name']}' "
+          f"({candidates[zid]['clients']} clients)")
+    return candidates[zid]["locators"][0]
+
+
+def run_router(config_path: str):
+    """
+    Run a router in this process until terminated.
+
+    Used when ``zenohd`` is not installed: the Zenoh library runs the same
+    routing in router mode.
+
+    Args:
+        config_path (str): Router configuration written by ``RouterNode``.
+    """
+    with open(config_path) as f:
+        config = Config.from_json5(f.read())
+    session = zenoh.open(config)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"Router {session.zid()} started from '{config_path}'", flush=True)
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    run_router(sys.argv[1])
@@ -49,3 +49,87 @@ class PanTiltCommand(msgspec.Struct):
 class Register(msgspec.Struct):
     """Robot registration message sent once upon connection."""
     robot_id: str
+
+
+class CameraFrame(msgspec.Struct):
+    """One chunk of a camera frame.
+
+    Frames larger than the publisher's chunk size are split into
+    ``chunk_count`` messages sharing the same ``seq``. ``data`` holds the raw
+    or compressed pixel bytes and decodes as a view of the received buffer.
+    """
+    stream: str
+    seq: int
+    stamp: float
+    shape: List[int]
+    dtype: str
+    compression: str = "raw"
+    chunk_index: int = 0
+    chunk_count: int = 1
+    data: memoryview = b""
+
+
+class CommandAck(msgspec.Struct):
+    """Reply of a device to an acknowledged command.
+
+    ``status`` is ``"ok"`` when ``dispatch_command`` returned normally,
+    ``"error"`` when it raised and ``"stale"`` when the device discarded the
+    command as too old, with the reason in ``error``.
+    """
+    status: str
+    dispatch_seconds: float
+    error: str = ""
+
+
+class Waypoint(msgspec.Struct, array_like=True):
+    """Velocity setpoint of a trajectory, due ``t`` seconds after it starts."""
+    t: float
+    v: float = 0.0
+    omega: float = 0.0
+
+
+class PoseWaypoint(msgspec.Struct, array_like=True):
+    """Pose setpoint of a trajectory, due ``t`` seconds after it starts."""
+    t: float
+    x: float
+    y: float
+    theta: float = 0.0
+
+
+class PoseSetpoint(msgspec.Struct):
+    """Command to hold a pose; dispatched by the device for ``PoseWaypoint``."""
+    x: float
+    y: float
+    theta: float = 0.0
+
+
+class Trajectory(msgspec.Struct):
+    """A timed path, executed on the device's own clock.
+
+    Holds either velocity ``waypoints`` (dispatched as ``Move``) or
+    ``poses`` (dispatched as ``PoseSetpoint``). Each setpoint is dispatched
+    at its ``t``; the trajectory ends with its last waypoint, so velocity
+    trajectories should end with a zero-velocity one.
+    """
+    trajectory_id: str
+    waypoints: List[Waypoint] = []
+    poses: List[PoseWaypoint] = []
+
+
+class CancelTrajectory(msgspec.Struct):
+    """Command to stop a running trajectory (any trajectory if no ID is given)."""
+    trajectory_id: str = ""
+
+
+class TrajectoryProgress(msgspec.Struct):
+    """Progress report of a trajectory, published by the executing device.
+
+    ``status`` is ``"running"``, ``"completed"``, ``"preempted"`` (replaced
+    by another trajectory or command), ``"cancelled"`` or ``"failed"``.
+    """
+    trajectory_id: str
+    status: str
+    completed: int
+    total: int
+    elapsed: float
+    error: str = ""
@@ -0,0 +1,240 @@
+"""
+Navis Metrics
+=============
+
+Lightweight, thread-safe measurement helpers shared by the Navis APIs.
+
+Key abstractions:
+    - ``LatencyHistogram``: Fixed-size log-bucketed histogram of durations
+      with percentile estimates, cheap enough to record every command.
+    - ``SequenceTracker``: Gap, loss and reordering accounting for topics
+      carrying a Navis ``Header``.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+import numpy as np
+
+# Most recent skipped sequence numbers remembered per topic, so that a late
+# arrival is only credited back when it was really counted as lost.
+MAX_MISSING = 1024
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations on logarithmically spaced buckets.
+
+    Memory use is fixed regardless of the number of samples. Percentiles are
+    estimated from the bucket edges, with a relative error bounded by the
+    bucket ratio (about 5% with the defaults).
+
+    Attributes:
+        edges (np.ndarray): Upper edge of each bucket, in seconds.
+        count (int): Number of recorded samples.
+    """
+
+    def __init__(self, min_seconds: float = 1e-5, max_seconds: float = 10.0,
+                 buckets_per_decade: int = 48):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            min_seconds (float): Upper edge of the first bucket.
+            max_seconds (float): Samples above this land in the last bucket.
+            buckets_per_decade (int): Resolution of the buckets.
+        """
+        decades = np.log10(max_seconds / min_seconds)
+        n_edges = int(np.ceil(decades * buckets_per_decade)) + 1
+        self.edges = np.geomspace(min_seconds, max_seconds, n_edges)
+        self._counts = np.zeros(n_edges + 1, dtype=np.int64)
+        self._lock = threading.Lock()
+        self.count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def record(self, seconds: float):
+        """
+        Add one sample.
+
+        Args:
+            seconds (float): The measured duration.
+        """
+        index = int(np.searchsorted(self.edges, seconds))
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            float: The upper edge of the bucket holding the percentile, in
+                seconds, or ``0.0`` when the histogram is empty.
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = max(1, int(np.ceil(q / 100.0 * self.count)))
+            index = int(np.searchsorted(np.cumsum(self._counts), rank))
+            maximum = self._max
+        if index >= len(self.edges):
+            return maximum
+        return min(float(self.edges[index]), maximum)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Return the usual latency figures.
+
+        Returns:
+            Dict[str, float]: ``count``, ``mean``, ``p50``, ``p90``, ``p99``
+                and ``max``, durations in seconds.
+        """
+        with self._lock:
+            count, total, maximum = self.count, self._sum, self._max
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": maximum,
+        }
+
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._counts[:] = 0
+            self.count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+
+@dataclass
+class TopicStats:
+    """
+    Delivery statistics of one sequenced topic.
+
+    Attributes:
+        received (int): Messages delivered in order.
+        lost (int): Sequence numbers skipped and never received.
+        late (int): Messages that arrived after a newer one (or twice).
+        restarts (int): Times the publisher restarted its sequence.
+    """
+    received: int = 0
+    lost: int = 0
+    late: int = 0
+    restarts: int = 0
+
+    @property
+    def loss_ratio(self) -> float:
+        """Fraction of published messages that were lost."""
+        total = self.received + self.lost
+        return self.lost / total if total else 0.0
+
+
+class _TopicState:
+    """Sequence state of one topic of a ``SequenceTracker``."""
+    __slots__ = ("seq", "stamp", "missing")
+
+    def __init__(self, seq: int, stamp: float):
+        self.seq = seq
+        self.stamp = stamp
+        self.missing: Set[int] = set()
+
+
+class SequenceTracker:
+    """
+    Track per-topic sequence numbers and source-to-receive latency.
+
+    Feed it the ``Header`` of every received message; ``observe`` tells
+    whether the message is the newest seen on its topic, so consumers can
+    discard stale or reordered samples.
+
+    A message with sequence number 1 and a newer stamp than the last one
+    starts a new sequence (the publisher restarted). The most recent
+    ``MAX_MISSING`` skipped sequence numbers of each topic are remembered,
+    so a late message is credited back from ``lost`` only if it was missing.
+
+    Attributes:
+        latency (LatencyHistogram): Source-to-receive latency of all
+            in-order messages.
+    """
+
+    def __init__(self):
+        """Initialize a tracker with no topics."""
+        self.latency = LatencyHistogram()
+        self._topics: Dict[str, _TopicState] = {}
+        self._stats: Dict[str, TopicStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, header, received: Optional[float] = None) -> bool:
+        """
+        Account for one received message.
+
+        Args:
+            key (str): The topic the message arrived on.
+            header (Header | None): The message header; messages without a
+                header are always accepted and not accounted.
+            received (float, optional): Receive time; defaults to now.
+
+        Returns:
+            bool: ``True`` if the message is newer than any seen before on
+                ``key``, ``False`` if it is late or a duplicate.
+        """
+        if header is None:
+            return True
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = TopicStats()
+            topic = self._topics.get(key)
+            seq = header.seq
+            if topic is None:
+                topic = self._topics[key] = _TopicState(seq, header.stamp)
+            elif seq <= topic.seq:
+                if seq == 1 and topic.seq > 1 and header.stamp > topic.stamp:
+                    # The publisher restarted and began a new sequence.
+                    stats.restarts += 1
+                    topic.missing.clear()
+                else:
+                    stats.late += 1
+                    if seq in topic.missing:
+                        # It was counted as lost when the gap was seen.
+                        topic.missing.discard(seq)
+                        stats.lost -= 1
+                    return False
+            else:
+                stats.lost += seq - topic.seq - 1
+                topic.missing.update(range(max(topic.seq + 1, seq - MAX_MISSING), seq))
+                if len(topic.missing) > MAX_MISSING:
+                    topic.missing = {s for s in topic.missing if s >= seq - MAX_MISSING}
+            topic.seq = seq
+            topic.stamp = header.stamp
+            stats.received += 1
+        self.latency.record((time.time() if received is None else received) - header.stamp)
+        return True
+
+    def stats(self) -> Dict[str, TopicStats]:
+        """
+        Return a snapshot of the statistics of every topic.
+
+        Returns:
+            Dict[str, TopicStats]: Mapping of topic key -> statistics.
+        """
+        with self._lock:
+            return {key: TopicStats(**vars(stats)) for key, stats in self._stats.items()}
+
+    def forget(self, key: str):
+        """Drop the state of a topic, e.g. after its publisher went away."""
+        with self._lock:
+            self._topics.pop(key, None)
+            self._stats.pop(key, None)
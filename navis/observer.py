@@ -0,0 +1,251 @@
+"""
+Navis Fleet Observer
+====================
+
+Pull-based, batched consumption of fleet telemetry.
+
+Instead of decoding and updating shared state for every sample,
+``FleetObserver`` only queues samples as they arrive and lets the consumer
+drain everything that arrived since the last call in one ``poll()``. Each
+poll decodes the samples in a single pass and returns them as an
+``ObservationBatch`` of columnar NumPy arrays, while the observer keeps
+the latest message of every device.
+
+Samples sent through shared memory (``DeviceClient(shared_memory=True)``)
+carry a reference to a slot the publisher reuses after a few writes, so
+their payload is copied out of the slot when the sample arrives rather
+than at the next poll. Other samples are queued as received.
+
+Drop policies, when the consumer falls behind by more than ``capacity``
+samples:
+    - ``"drop_oldest"``: The oldest queued samples are discarded, so a
+      poll always sees the most recent traffic.
+    - ``"block"``: The receiving thread waits for the next poll, applying
+      backpressure to the session instead of dropping, for consumers that
+      must see every sample.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import msgspec
+import numpy as np
+import zenoh
+from zenoh import Config
+
+from navis.categories import ROBOTS
+from navis.header import decode_header
+from navis.messages import Measurement
+from navis.metrics import SequenceTracker
+from navis.prediction import velocity_of
+from navis.transport import decode_payload, is_shm_sample, payload_buffer
+from navis.zones import parse_key, selector
+
+DROP_POLICIES = ("drop_oldest", "block")
+
+
+@dataclass
+class ObservationBatch:
+    """
+    Samples drained by one ``FleetObserver.poll()``, in arrival order.
+
+    Attributes:
+        device_ids (List[str]): Device that sent each sample.
+        stamps (np.ndarray): Source time of each sample (receive time for
+            samples without a header).
+        seqs (np.ndarray): Sequence number of each sample, ``0`` if unknown.
+        columns (Dict[str, np.ndarray]): One array per numeric field of the
+            message type, plus ``v`` and ``omega`` for messages with a
+            velocity ``state``.
+        messages (List): The decoded messages.
+    """
+    device_ids: List[str] = field(default_factory=list)
+    stamps: np.ndarray = field(default_factory=lambda: np.empty(0))
+    seqs: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint64))
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    messages: List = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+class FleetObserver:
+    """
+    Consume a topic of every device in a category, in batches.
+
+    Out-of-order samples are discarded, as in the visualizer, and
+    ``self.tracker`` accounts for loss and latency per device. Samples that
+    fail to decode are discarded before they reach the tracker.
+
+    Attributes:
+        latest (Dict[str, object]): Latest message of each device.
+        latest_stamps (Dict[str, float]): Source time of each latest message.
+        tracker (SequenceTracker): Delivery statistics, keyed by device ID.
+    """
+
+    def __init__(self, topic: str = "measurement", message_type: type = Measurement,
+                 category: str = ROBOTS, zone: str = "*", capacity: int = 10000,
+                 policy: str = "drop_oldest", session: zenoh.Session = None):
+        """
+        Subscribe to ``topic`` of every device in a category.
+
+        Args:
+            topic (str): Topic suffix to observe (e.g., ``"measurement"``).
+            message_type (type): ``msgspec.Struct`` type of the messages.
+            category (str): Device category (e.g., ``ROBOTS``).
+            zone (str): Only observe devices in this zone; ``"*"`` for all.
+            capacity (int): Maximum number of samples buffered between polls.
+            policy (str): ``"drop_oldest"`` or ``"block"``, see the module docs.
+            session (zenoh.Session, optional): Session to subscribe on; a new
+                one is opened (and closed by ``close``) if omitted.
+        """
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}', expected one of {DROP_POLICIES}")
+        self.message_type = message_type
+        self.decoder = msgspec.msgpack.Decoder(message_type)
+        self.latest: Dict[str, object] = {}
+        self.latest_stamps: Dict[str, float] = {}
+        self.tracker = SequenceTracker()
+
+        fields = msgspec.structs.fields(message_type)
+        self._numeric = [f.name for f in fields if f.type in (int, float)]
+        self._has_velocity = any(f.name == "state" for f in fields)
+        self._device_of_key: Dict[str, str] = {}
+
+        # Received (sample, payload) pairs, oldest first. With "drop_oldest"
+        # the bounded deque discards the oldest pair on overflow; with
+        # "block" the receiving thread waits on ``_space`` instead.
+        self.capacity = capacity
+        self._blocking = policy == "block"
+        self._pending = deque() if self._blocking else deque(maxlen=capacity)
+        self._space = threading.Condition()
+        self._closed = False
+
+        self._owns_session = session is None
+        self.session = session if session is not None else zenoh.open(Config())
+        self.key = selector(category, zone, "*", topic)
+        self._subscriber = self.session.declare_subscriber(self.key, self._on_sample)
+        print(f"[Observer] Observing '{self.key}' ({policy}, capacity {capacity})")
+
+    def _device_id(self, key: str) -> str:
+        """Return the device ID of a key, parsing each distinct key once."""
+        device_id = self._device_of_key.get(key)
+        if device_id is None:
+            _, _, device_id, _ = parse_key(key)
+            self._device_of_key[key] = device_id
+        return device_id
+
+    def _on_sample(self, sample: zenoh.Sample):
+        """Queue a received sample, copying shared-memory payloads out of their slot."""
+        if is_shm_sample(sample):
+            try:
+                payload = decode_payload(sample, bytes)
+            except Exception as e:
+                print(f"[Observer] Failed to read sample on '{sample.key_expr}': {e}")
+                return
+        else:
+            payload = payload_buffer(sample.payload)
+        if self._blocking:
+            with self._space:
+                while len(self._pending) >= self.capacity and not self._closed:
+                    self._space.wait()
+                self._pending.append((sample, payload))
+        else:
+            self._pending.append((sample, payload))
+
+    def poll(self, max_samples: Optional[int] = None) -> ObservationBatch:
+        """
+        Drain and decode the samples received since the last poll.
+
+        Never blocks; returns an empty batch if nothing arrived.
+
+        Args:
+            max_samples (int, optional): Stop after this many samples and
+                leave the rest for the next poll.
+
+        Returns:
+            ObservationBatch: The in-order samples, in arrival order.
+        """
+        device_ids, stamps, seqs, messages = [], [], [], []
+        received = time.time()
+        drained = 0
+        while max_samples is None or drained < max_samples:
+            try:
+                sample, payload = self._pending.popleft()
+            except IndexError:
+                break
+            drained += 1
+            try:
+                device_id = self._device_id(str(sample.key_expr))
+                header = decode_header(sample.attachment)
+                message = self.decoder.decode(payload)
+            except Exception as e:
+                print(f"[Observer] Failed to decode sample on '{sample.key_expr}': {e}")
+                continue
+            if not self.tracker.observe(device_id, header, received):
+                continue  # Older than a sample already observed.
+            stamp = header.stamp if header is not None else received
+            device_ids.append(device_id)
+            stamps.append(stamp)
+            seqs.append(header.seq if header is not None else 0)
+            messages.append(message)
+            self.latest[device_id] = message
+            self.latest_stamps[device_id] = stamp
+        if self._blocking and drained:
+            with self._space:
+                self._space.notify_all()
+
+        n = len(messages)
+        columns = {name: np.fromiter((getattr(m, name) for m in messages), float, n)
+                   for name in self._numeric}
+        if self._has_velocity:
+            velocities = np.array([velocity_of(m.state) for m in messages], dtype=float)
+            velocities = velocities.reshape(n, 2)
+            columns["v"], columns["omega"] = velocities[:, 0], velocities[:, 1]
+        return ObservationBatch(device_ids=device_ids, stamps=np.array(stamps, dtype=float),
+                                seqs=np.array(seqs, dtype=np.uint64), columns=columns,
+                                messages=messages)
+
+    async def batches(self, interval: float = 0.01):
+        """
+        Asynchronously iterate over non-empty batches.
+
+        Args:
+            interval (float): Time to sleep between polls finding nothing.
+
+        Yields:
+            ObservationBatch: Each non-empty batch.
+        """
+        while True:
+            batch = self.poll()
+            if len(batch):
+                yield batch
+            else:
+                await asyncio.sleep(interval)
+
+    def __aiter__(self):
+        return self.batches()
+
+    def forget(self, device_id: str):
+        """Drop the latest message and statistics of a device."""
+        self.latest.pop(device_id, None)
+        self.latest_stamps.pop(device_id, None)
+        self.tracker.forget(device_id)
+
+    def close(self):
+        """Stop observing, closing the session if the observer opened it."""
+        with self._space:
+            self._closed = True
+            self._space.notify_all()
+        try:
+            self._subscriber.undeclare()
+            if self._owns_session:
+                self.session.close()
+        except Exception as e:
+            print(f"[Observer] Error closing: {e}")
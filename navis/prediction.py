@@ -0,0 +1,254 @@
+"""
+Navis Pose Prediction
+=====================
+
+Dead reckoning of robot poses between measurements.
+
+A ``Measurement`` whose ``state`` carries ``v`` and ``omega`` (such as
+``DifferentialDriveState``) describes where the robot is heading, so its
+pose can be extrapolated with the unicycle model until the next sample.
+Both ends of a topic share that model:
+
+    - Consumers keep a ``FleetPredictor`` and extrapolate the whole fleet
+      to the current time in one vectorized call.
+    - Publishers attach a ``DeadbandFilter`` to their measurement task and
+      only send a sample when the true pose has drifted from what
+      consumers predict by more than a tolerance, plus a periodic heartbeat.
+
+Predictions start from the source timestamp in the message header, so
+publisher and consumer clocks should be synchronized.
+"""
+import math
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def velocity_of(state) -> Tuple[float, float]:
+    """
+    Extract the linear and angular velocity from a measurement state.
+
+    Args:
+        state: The ``state`` of a ``Measurement``; either a state struct or
+            the dict it decodes to when the measurement is decoded generically.
+
+    Returns:
+        Tuple[float, float]: ``(v, omega)``, zero for states without velocities.
+    """
+    if isinstance(state, dict):
+        return float(state.get("v", 0.0)), float(state.get("omega", 0.0))
+    return float(getattr(state, "v", 0.0)), float(getattr(state, "omega", 0.0))
+
+
+def predict_pose(x, y, theta, v, omega, dt):
+    """
+    Extrapolate poses along constant-velocity arcs (unicycle model).
+
+    All arguments may be scalars or NumPy arrays of matching shape.
+
+    Args:
+        x, y, theta: Pose at the start.
+        v: Linear velocity.
+        omega: Angular velocity.
+        dt: Time to extrapolate over, in seconds.
+
+    Returns:
+        Tuple: The predicted ``(x, y, theta)``.
+    """
+    theta_end = theta + omega * dt
+    straight = np.abs(omega) < 1e-6
+    safe_omega = np.where(straight, 1.0, omega)
+    radius = v / safe_omega
+    x_end = np.where(straight, x + v * dt * np.cos(theta),
+                     x + radius * (np.sin(theta_end) - np.sin(theta)))
+    y_end = np.where(straight, y + v * dt * np.sin(theta),
+                     y - radius * (np.cos(theta_end) - np.cos(theta)))
+    return x_end, y_end, theta_end
+
+
+def _angle_difference(a: float, b: float) -> float:
+    """Smallest absolute difference between two headings."""
+    return abs(math.remainder(a - b, math.tau))
+
+
+class FleetPredictor:
+    """
+    Latest measurement of every robot, extrapolated to any time.
+
+    State is kept in columnar arrays so predicting the whole fleet is a
+    handful of NumPy operations. Thread-safe: update from subscriber
+    callbacks and predict from the drawing or planning thread.
+    """
+
+    def __init__(self, max_horizon: float = 1.0, capacity: int = 64):
+        """
+        Initialize a predictor with no robots.
+
+        Args:
+            max_horizon (float): Longest extrapolation in seconds; a robot
+                silent for longer stays at its pose predicted at that horizon.
+            capacity (int): Initial number of robots; grows as needed.
+        """
+        self.max_horizon = max_horizon
+        self._ids: List[str] = []
+        self._index = {}
+        self._state = np.zeros((6, capacity))  # stamp, x, y, theta, v, omega
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def update(self, robot_id: str, stamp: float, x: float, y: float, theta: float,
+               v: float = 0.0, omega: float = 0.0):
+        """
+        Record a robot's latest pose and velocity.
+
+        Samples older than the one already held are ignored.
+
+        Args:
+            robot_id (str): The robot's ID.
+            stamp (float): Source time of the pose.
+            x (float): X position.
+            y (float): Y position.
+            theta (float): Heading in radians.
+            v (float): Linear velocity.
+            omega (float): Angular velocity.
+        """
+        with self._lock:
+            index = self._index.get(robot_id)
+            if index is None:
+                index = self._index[robot_id] = len(self._ids)
+                self._ids.append(robot_id)
+                if index == self._state.shape[1]:
+                    self._state = np.concatenate((self._state, np.zeros_like(self._state)), axis=1)
+            elif stamp < self._state[0, index]:
+                return
+            self._state[:, index] = (stamp, x, y, theta, v, omega)
+
+    def update_measurement(self, robot_id: str, stamp: float, measurement):
+        """
+        Record a robot's latest ``Measurement``.
+
+        Args:
+            robot_id (str): The robot's ID.
+            stamp (float): Source time of the measurement (its header stamp).
+            measurement (Measurement): The received measurement.
+        """
+        v, omega = velocity_of(measurement.state)
+        self.update(robot_id, stamp, measurement.x, measurement.y, measurement.theta, v, omega)
+
+    def predict(self, t: float) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict the pose of every robot at time ``t``.
+
+        Args:
+            t (float): Time to predict for, on the clock of the header stamps.
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]: The robot
+                IDs and their predicted ``x``, ``y`` and ``theta``.
+        """
+        with self._lock:
+            ids = list(self._ids)
+            stamp, x, y, theta, v, omega = self._state[:, :len(ids)].copy()
+        dt = np.clip(t - stamp, 0.0, self.max_horizon)
+        return (ids, *predict_pose(x, y, theta, v, omega, dt))
+
+    def predict_one(self, robot_id: str, t: float) -> Optional[Tuple[float, float, float]]:
+        """
+        Predict the pose of one robot at time ``t``.
+
+        Args:
+            robot_id (str): The robot's ID.
+            t (float): Time to predict for.
+
+        Returns:
+            Tuple[float, float, float] | None: The predicted ``(x, y, theta)``,
+                or ``None`` for an unknown robot.
+        """
+        with self._lock:
+            index = self._index.get(robot_id)
+            if index is None:
+                return None
+            stamp, x, y, theta, v, omega = self._state[:, index]
+        dt = min(max(t - stamp, 0.0), self.max_horizon)
+        return tuple(float(value) for value in predict_pose(x, y, theta, v, omega, dt))
+
+    def forget(self, robot_id: str):
+        """Stop predicting a robot, e.g. after it went offline."""
+        with self._lock:
+            index = self._index.pop(robot_id, None)
+            if index is None:
+                return
+            last = len(self._ids) - 1
+            if index != last:
+                # Move the last robot into the freed column.
+                moved = self._ids[last]
+                self._ids[index] = moved
+                self._index[moved] = index
+                self._state[:, index] = self._state[:, last]
+            self._ids.pop()
+
+
+class DeadbandFilter:
+    """
+    Decide which measurements a publisher needs to send.
+
+    The filter replays the consumers' prediction from the last sent
+    measurement and lets a new one through only when the true pose has
+    drifted from it by more than the tolerances, or when nothing was sent
+    for ``heartbeat_seconds``.
+
+    Attributes:
+        sent (int): Measurements let through.
+        suppressed (int): Measurements withheld because consumers can
+            predict them.
+    """
+
+    def __init__(self, position_tolerance: float = 0.05, heading_tolerance: float = 0.05,
+                 heartbeat_seconds: float = 0.5):
+        """
+        Initialize a filter that sends the first measurement.
+
+        Args:
+            position_tolerance (float): Allowed position error in meters.
+            heading_tolerance (float): Allowed heading error in radians.
+            heartbeat_seconds (float): Time after which a measurement is
+                sent even if predictable. Measurements are only checked when
+                published, so the real gap reaches the heartbeat plus the
+                publishing interval; keep that sum below consumers'
+                ``max_horizon`` (1 s by default).
+        """
+        self.position_tolerance = position_tolerance
+        self.heading_tolerance = heading_tolerance
+        self.heartbeat_seconds = heartbeat_seconds
+        self.sent = 0
+        self.suppressed = 0
+        self._last = None
+
+    def should_send(self, stamp: float, measurement) -> bool:
+        """
+        Return whether a measurement must be sent, and remember it if so.
+
+        Args:
+            stamp (float): Source time the measurement will be stamped with.
+            measurement (Measurement): The current measurement.
+
+        Returns:
+            bool: ``True`` if consumers' prediction is off by more than the
+                tolerances, or the heartbeat is due.
+        """
+        v, omega = velocity_of(measurement.state)
+        if self._last is not None:
+            last_stamp, x, y, theta, last_v, last_omega = self._last
+            if stamp - last_stamp < self.heartbeat_seconds:
+                px, py, ptheta = predict_pose(x, y, theta, last_v, last_omega, stamp - last_stamp)
+                error = math.hypot(measurement.x - px, measurement.y - py)
+                if (error <= self.position_tolerance
+                        and _angle_difference(measurement.theta, ptheta) <= self.heading_tolerance):
+                    self.suppressed += 1
+                    return False
+        self._last = (stamp, measurement.x, measurement.y, measurement.theta, v, omega)
+        self.sent += 1
+        return True
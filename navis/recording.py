@@ -0,0 +1,174 @@
+"""
+Navis Pose Recordings
+=====================
+
+Compact on-disk recordings of fleet poses, for offline review and rendering.
+
+A recording is a small magic header followed by length-prefixed msgpack
+chunks. Each chunk holds a block of fixed-size pose records (a NumPy
+structured array) and the IDs of robots first seen in that block, so
+appending is cheap and loading is a handful of ``np.frombuffer`` calls.
+
+Records carry the robot's linear and angular velocity next to its pose, so
+a renderer can dead-reckon between samples the same way live consumers do
+(see ``navis.prediction``). Publishers using a ``DeadbandFilter`` only send
+a pose when that prediction drifts, so the velocities are what keeps a
+sparse recording smooth. Recordings from before velocities were stored
+still load, with zero velocities.
+"""
+import struct
+import threading
+from typing import List, Tuple
+
+import msgspec
+import numpy as np
+
+MAGIC = b"NAVISREC2\n"
+_MAGIC_V1 = b"NAVISREC1\n"
+
+# One row per received pose. ``robot`` indexes the recording's robot IDs.
+POSE_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("robot", "<u4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("theta", "<f4"),
+    ("v", "<f4"),
+    ("omega", "<f4"),
+])
+
+# Rows of version 1 recordings, which had no velocities.
+_POSE_DTYPE_V1 = np.dtype([
+    ("t", "<f8"),
+    ("robot", "<u4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("theta", "<f4"),
+])
+
+_LENGTH = struct.Struct("<I")
+
+
+class PoseChunk(msgspec.Struct, array_like=True):
+    """A block of pose records and the robot IDs it introduces."""
+    new_robot_ids: List[str]
+    records: bytes
+
+
+class PoseRecorder:
+    """
+    Append robot poses to a recording file.
+
+    Poses are buffered in memory and written in chunks of ``chunk_size``
+    records. Safe to call from Zenoh callback threads.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096):
+        """
+        Create (or truncate) a recording.
+
+        Args:
+            path (str): File to write.
+            chunk_size (int): Number of poses buffered before each write.
+        """
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._encoder = msgspec.msgpack.Encoder()
+        self._buffer = np.empty(chunk_size, dtype=POSE_DTYPE)
+        self._size = 0
+        self._robot_index = {}
+        self._new_robot_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def append(self, t: float, robot_id: str, x: float, y: float, theta: float,
+               v: float = 0.0, omega: float = 0.0):
+        """
+        Record one pose.
+
+        Args:
+            t (float): Time of the pose in seconds.
+            robot_id (str): The robot's ID.
+            x (float): X position.
+            y (float): Y position.
+            theta (float): Heading in radians.
+            v (float): Linear velocity.
+            omega (float): Angular velocity.
+        """
+        with self._lock:
+            index = self._robot_index.get(robot_id)
+            if index is None:
+                index = self._robot_index[robot_id] = len(self._robot_index)
+                self._new_robot_ids.append(robot_id)
+            self._buffer[self._size] = (t, index, x, y, theta, v, omega)
+            self._size += 1
+            if self._size == len(self._buffer):
+                self._flush()
+
+    def _flush(self):
+        """Write the buffered poses as one chunk. Requires ``self._lock``."""
+        if self._size == 0:
+            return
+        chunk = PoseChunk(new_robot_ids=self._new_robot_ids,
+                          records=self._buffer[:self._size].tobytes())
+        payload = self._encoder.encode(chunk)
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self._size = 0
+        self._new_robot_ids = []
+
+    def close(self):
+        """Write the remaining poses and close the file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+
+
+def load_recording(path: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Read a recording written by ``PoseRecorder``.
+
+    Args:
+        path (str): The recording file.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: The robot IDs, and the pose records
+            (``POSE_DTYPE``) in the order they were recorded. Velocities
+            of version 1 recordings are zero.
+
+    Raises:
+        ValueError: If the file is not a Navis recording.
+    """
+    decoder = msgspec.msgpack.Decoder(PoseChunk)
+    robot_ids: List[str] = []
+    blocks = []
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic == MAGIC:
+            dtype = POSE_DTYPE
+        elif magic == _MAGIC_V1:
+            dtype = _POSE_DTYPE_V1
+        else:
+            raise ValueError(f"'{path}' is not a Navis pose recording.")
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                break
+            payload = f.read(_LENGTH.unpack(prefix)[0])
+            try:
+                chunk = decoder.decode(payload)
+            except msgspec.DecodeError:
+                break  # Truncated final chunk, e.g. after a crash.
+            robot_ids.extend(chunk.new_robot_ids)
+            blocks.append(np.frombuffer(chunk.records, dtype=dtype))
+    if not blocks:
+        return robot_ids, np.empty(0, dtype=POSE_DTYPE)
+    records = np.concatenate(blocks)
+    if dtype is not POSE_DTYPE:
+        upgraded = np.zeros(len(records), dtype=POSE_DTYPE)
+        for name in dtype.names:
+            upgraded[name] = records[name]
+        records = upgraded
+    return robot_ids, records
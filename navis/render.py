@@ -0,0 +1,227 @@
+"""
+Navis Batch Renderer
+====================
+
+Renders pose recordings to video without a display, for incident review.
+
+The recording is sorted once and shared with a pool of worker processes
+through a memory-mapped file. Each worker renders a contiguous segment of
+frames with the Agg backend: the static parts of the plot (axes, grid,
+labels) are drawn once, and every frame only restores that background and
+redraws the robot artists, which are updated in place. Raw RGBA frames
+are streamed into one ``ffmpeg`` encoder per segment, and the segments are
+joined without re-encoding. Without ``ffmpeg`` each frame is written as a
+PNG instead.
+
+Between recorded samples each robot is dead-reckoned from its latest pose
+and velocity with ``predict_pose``, capped at ``max_horizon`` like a live
+``FleetPredictor``, so recordings thinned by a ``DeadbandFilter`` replay as
+smoothly as they were seen live.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+
+from navis.prediction import predict_pose
+from navis.recording import load_recording
+
+# Per-process rendering state, set up by ``_init_worker``.
+_WORKER = {}
+
+
+def _init_worker(poses_path: str, starts: np.ndarray, ends: np.ndarray, dims: float,
+                 size: int, t0: float, frame_step: float, fps: float, max_horizon: float,
+                 encoder: Optional[str]):
+    """Map the sorted poses and build this worker's figure and artists."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    poses = np.load(poses_path, mmap_mode="r")
+    fig = Figure(figsize=(size / 100, size / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_xlim(-dims, dims)
+    ax.set_ylim(-dims, dims)
+    ax.set_xlabel("X [m]")
+    ax.set_ylabel("Y [m]")
+    ax.set_title("Fleet Replay")
+    ax.grid(True)
+    ax.set_aspect('equal', adjustable='box')
+
+    # Robot artists are animated: excluded from the background and redrawn
+    # on top of it for every frame.
+    dots = ax.scatter([], [], s=60, animated=True)
+    headings = LineCollection([], linewidths=2, animated=True)
+    ax.add_collection(headings)
+    clock = ax.text(0.02, 0.98, "", transform=ax.transAxes, va="top",
+                    family="monospace", animated=True)
+    fig.tight_layout()
+    canvas.draw()
+
+    n_robots = len(starts)
+    _WORKER.update(
+        poses=poses, starts=starts, ends=ends, canvas=canvas, ax=ax,
+        background=canvas.copy_from_bbox(fig.bbox), dots=dots, headings=headings,
+        clock=clock, colors=matplotlib.colormaps["tab10"](np.arange(n_robots) % 10),
+        heading_length=dims * 0.05, t0=t0, frame_step=frame_step, fps=fps,
+        max_horizon=max_horizon, encoder=encoder, width=int(canvas.get_width_height()[0]),
+        height=int(canvas.get_width_height()[1]),
+    )
+
+
+def _segment_poses(first: int, last: int):
+    """Return the pose of every robot at frames ``first`` to ``last - 1``."""
+    w = _WORKER
+    times = w["t0"] + np.arange(first, last) * w["frame_step"]
+    n_robots = len(w["starts"])
+    shape = (len(times), n_robots)
+    x, y, theta = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    valid = np.zeros(shape, dtype=bool)
+    poses = w["poses"]
+    for robot, (start, end) in enumerate(zip(w["starts"], w["ends"])):
+        if start == end:
+            continue
+        robot_t = poses["t"][start:end]
+        # Latest pose at or before each frame time, extrapolated to it.
+        index = np.searchsorted(robot_t, times, side="right") - 1
+        seen = index >= 0
+        rows = poses[start:end][np.maximum(index, 0)]
+        dt = np.clip(times - rows["t"], 0.0, w["max_horizon"])
+        x[:, robot], y[:, robot], theta[:, robot] = predict_pose(
+            rows["x"].astype(float), rows["y"].astype(float), rows["theta"].astype(float),
+            rows["v"].astype(float), rows["omega"].astype(float), dt)
+        valid[:, robot] = seen
+    return times, x, y, theta, valid
+
+
+def _draw_frame(t: float, x: np.ndarray, y: np.ndarray, theta: np.ndarray, valid: np.ndarray):
+    """Update the robot artists and blit them over the background."""
+    w = _WORKER
+    xy = np.column_stack((x[valid], y[valid]))
+    tip = xy + w["heading_length"] * np.column_stack((np.cos(theta[valid]), np.sin(theta[valid])))
+    colors = w["colors"][valid]
+
+    w["canvas"].restore_region(w["background"])
+    w["dots"].set_offsets(xy)
+    w["dots"].set_facecolor(colors)
+    w["headings"].set_segments(np.stack((xy, tip), axis=1))
+    w["headings"].set_color(colors)
+    w["clock"].set_text(f"t = {t - w['t0']:9.2f} s")
+    ax = w["ax"]
+    ax.draw_artist(w["headings"])
+    ax.draw_artist(w["dots"])
+    ax.draw_artist(w["clock"])
+    return w["canvas"].buffer_rgba()
+
+
+def _render_segment(first: int, last: int, target: str) -> str:
+    """Render frames ``first`` to ``last - 1`` into a video segment or PNG directory."""
+    w = _WORKER
+    times, x, y, theta, valid = _segment_poses(first, last)
+    if w["encoder"] is None:
+        import matplotlib.image
+        for i, t in enumerate(times):
+            frame = np.asarray(_draw_frame(t, x[i], y[i], theta[i], valid[i]))
+            matplotlib.image.imsave(os.path.join(target, f"frame_{first + i:07d}.png"), frame)
+        return target
+
+    process = subprocess.Popen(
+        [w["encoder"], "-loglevel", "error", "-y",
+         "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w['width']}x{w['height']}",
+         "-r", f"{w['fps']}", "-i", "-",
+         "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", target],
+        stdin=subprocess.PIPE)
+    try:
+        for i, t in enumerate(times):
+            process.stdin.write(_draw_frame(t, x[i], y[i], theta[i], valid[i]))
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"Encoder failed on segment starting at frame {first}.")
+    return target
+
+
+def render_recording(path: str, output: str, fps: float = 30.0, speed: float = 1.0,
+                     dims: float = 30, size: int = 1000, workers: int = None,
+                     segment_seconds: float = 10.0, max_horizon: float = 1.0) -> str:
+    """
+    Render a pose recording to a video (or PNG sequence) without a display.
+
+    Args:
+        path (str): Recording written by ``PoseRecorder``.
+        output (str): Output video file. Without ``ffmpeg`` on the ``PATH``,
+            PNG frames are written to a directory named after it instead.
+        fps (float): Frames per second of the output.
+        speed (float): Recorded seconds per output second.
+        dims (float): Plot dimensions in meters (from -dims to +dims).
+        size (int): Width and height of the frames in pixels.
+        workers (int, optional): Number of render processes; defaults to
+            the number of CPUs.
+        segment_seconds (float): Length of the video each task renders.
+        max_horizon (float): Longest time a robot's last recorded pose is
+            extrapolated along its velocity; a robot silent for longer
+            stays at the pose predicted at that horizon.
+
+    Returns:
+        str: The path of the video or PNG directory written.
+    """
+    robot_ids, records = load_recording(path)
+    if len(records) == 0:
+        raise ValueError(f"Recording '{path}' contains no poses.")
+
+    # Sort by robot, then time, so each robot's poses are contiguous.
+    poses = records[np.lexsort((records["t"], records["robot"]))]
+    robots = np.arange(len(robot_ids))
+    starts = np.searchsorted(poses["robot"], robots, side="left")
+    ends = np.searchsorted(poses["robot"], robots, side="right")
+
+    size -= size % 2  # Encoders need even frame dimensions.
+    frame_step = speed / fps
+    t0, t1 = float(poses["t"].min()), float(poses["t"].max())
+    n_frames = int((t1 - t0) / frame_step) + 1
+    frames_per_segment = max(1, int(segment_seconds * fps))
+    segments = [(first, min(first + frames_per_segment, n_frames))
+                for first in range(0, n_frames, frames_per_segment)]
+
+    encoder = shutil.which("ffmpeg")
+    if encoder is None:
+        output = os.path.splitext(output)[0]
+        os.makedirs(output, exist_ok=True)
+        print(f"[RENDER] ffmpeg not found, writing PNG frames to '{output}/'")
+    print(f"[RENDER] {len(robot_ids)} robots, {len(records)} poses, {t1 - t0:.1f}s recorded "
+          f"-> {n_frames} frames in {len(segments)} segments")
+
+    with tempfile.TemporaryDirectory(prefix="navis_render_") as tmp:
+        poses_path = os.path.join(tmp, "poses.npy")
+        np.save(poses_path, poses)
+        del poses, records
+
+        targets = [output if encoder is None else os.path.join(tmp, f"segment_{i:05d}.mp4")
+                   for i in range(len(segments))]
+        initargs = (poses_path, starts, ends, dims, size, t0, frame_step, fps, max_horizon,
+                    encoder)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            futures = [pool.submit(_render_segment, first, last, target)
+                       for (first, last), target in zip(segments, targets)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                print(f"[RENDER] Segment {done}/{len(segments)} done")
+
+        if encoder is not None:
+            concat_list = os.path.join(tmp, "segments.txt")
+            with open(concat_list, "w") as f:
+                f.writelines(f"file '{target}'\n" for target in targets)
+            subprocess.run([encoder, "-loglevel", "error", "-y", "-f", "concat", "-safe", "0",
+                            "-i", concat_list, "-c", "copy", output], check=True)
+
+    print(f"[RENDER] Wrote '{output}'")
+    return output
@@ -7,33 +7,108 @@ Runs the Zenoh router (``zenohd``) and ID service together.
 The router handles all message routing between devices and controllers.
 The ID service assigns unique UUIDs to connecting devices.
 
+With ``--routers N`` (or explicit ``--listen``/``--connect`` endpoints for
+a mesh spanning hosts) it launches and supervises a mesh of routers
+instead, restarting any that exit, with one ID service replica per router.
+Each replica allocates IDs from its own partition, so IDs never collide
+across the mesh. ``--routers N --partition P`` uses partitions ``P`` to
+``P + N - 1``, so hosts meshed together need non-overlapping ranges (e.g.,
+``--partition 0`` and ``--partition 3`` for three routers per host).
+Devices choose a router with ``router="auto"``.
+
 Usage:
     uv run navis-router.py
+    uv run navis-router.py --routers 3
+    uv run navis-router.py --listen tcp/0.0.0.0:7447 --connect tcp/10.0.0.2:7447 --partition 1
 """
 
+import argparse
+import itertools
+import os
+import secrets
+import shutil
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 import uuid
+from typing import List
+
 import zenoh
 
+from navis.mesh import DEFAULT_PORT, RouterNode, local_mesh, session_config
+
+# Upper bound on the IDs leased by a single query.
+MAX_IDS_PER_REQUEST = 10000
+
+# Bits of the partitioned IDs (see ``partitioned_id``).
+PARTITION_BITS = 16
+EPOCH_BITS = 44
+COUNTER_BITS = 62
+
+
+def partitioned_id(partition: int, epoch: int, counter: int) -> str:
+    """
+    Build a device ID that cannot collide with other partitions' IDs.
+
+    The ID is a version 8 (custom) UUID holding the partition number, the
+    random epoch of the ID service instance and a counter, so distinct
+    partitions and successive leases never produce the same ID.
+
+    Args:
+        partition (int): Partition of the ID service replica.
+        epoch (int): Random number drawn when the replica started.
+        counter (int): Number of IDs leased before by the replica.
+
+    Returns:
+        str: The ID, formatted as a UUID.
+    """
+    high = (partition << 32) | (epoch >> 12)  # 48 bits before the version
+    value = ((high << 80) | (0x8 << 76) | ((epoch & 0xFFF) << 64)
+             | (0b10 << 62) | (counter & ((1 << COUNTER_BITS) - 1)))
+    return str(uuid.UUID(int=value))
+
 
 class IDService:
     """
     ID Service for Navis devices.
 
     Assigns unique UUIDs to devices that request them via a Zenoh queryable.
+    A query with a ``count`` parameter (e.g. ``navis/admin/id_service?count=100``)
+    leases that many IDs at once, returned one per line.
+
+    Several replicas can serve one mesh, each with its own ``partition``;
+    the queryable is declared complete, so a device is answered by the
+    nearest replica only.
 
     Attributes:
         session (zenoh.Session | None): The active Zenoh session.
         queryable (zenoh.Queryable | None): The declared Zenoh queryable for ID requests.
+        partition (int): Partition the replica allocates IDs from.
+        leased (int): Number of IDs leased so far.
     """
 
-    def __init__(self):
-        """Initialize the ID service with no active session or queryable."""
+    def __init__(self, partition: int = 0, router: str = None):
+        """
+        Initialize the ID service with no active session or queryable.
+
+        Args:
+            partition (int): Partition of this replica, unique across the
+                mesh (``0`` to ``2**16 - 1``).
+            router (str, optional): Endpoint of the router to attach to;
+                routers are discovered by scouting by default.
+        """
+        if not 0 <= partition < 1 << PARTITION_BITS:
+            raise ValueError(f"partition must be between 0 and {(1 << PARTITION_BITS) - 1}")
         self.session = None
         self.queryable = None
+        self.partition = partition
+        self.router = router
+        self.leased = 0
+        self._epoch = secrets.randbits(EPOCH_BITS)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
 
     def start(self):
         """
@@ -43,25 +118,39 @@ class IDService:
         ``navis/admin/id_service`` that generates and returns a new UUID
         whenever a device queries it.
         """
-        print("[ID Service] Starting...")
-        self.session = zenoh.open(zenoh.Config())
+        print(f"[ID Service] Starting (partition {self.partition})...")
+        self.session = zenoh.open(session_config(self.router))
 
         def id_handler(query):
             """
             Handle incoming ID requests.
 
-            Generates a new UUID and replies to the query.
+            Generates ``count`` new UUIDs (one by default) and replies to the
+            query with them, separated by newlines.
 
             Args:
                 query (zenoh.Query): The incoming Zenoh query object.
             """
-            new_id = str(uuid.uuid4())
-            print(f"[ID Service] Assigned ID: {new_id}")
-            query.reply(query.key_expr, new_id.encode())
+            try:
+                count = int(query.parameters.get("count") or 1)
+            except ValueError:
+                query.reply_err(b"count must be an integer")
+                return
+            count = min(max(count, 1), MAX_IDS_PER_REQUEST)
+            with self._lock:
+                new_ids = [partitioned_id(self.partition, self._epoch, next(self._counter))
+                           for _ in range(count)]
+                self.leased += count
+            if count == 1:
+                print(f"[ID Service] Assigned ID: {new_ids[0]}")
+            else:
+                print(f"[ID Service] Leased {count} IDs")
+            query.reply(query.key_expr, "\n".join(new_ids).encode())
 
         self.queryable = self.session.declare_queryable(
             "navis/admin/id_service",
-            id_handler
+            id_handler,
+            complete=True
         )
         print("[ID Service]  Ready on ``navis/admin/id_service``\n")
 
@@ -106,13 +195,165 @@ def run_zenohd():
         sys.exit(1)
 
 
+class RouterMesh:
+    """
+    Launch and supervise the routers of a mesh and their ID service replicas.
+
+    Each router runs as a ``zenohd`` process with a generated configuration
+    or, when ``zenohd`` is not installed, as a Python process running the
+    Zenoh library in router mode. A router that exits is restarted, with a
+    delay that doubles (up to 30 seconds) while it keeps failing.
+    """
+
+    def __init__(self, nodes: List[RouterNode], use_zenohd: bool = None,
+                 config_dir: str = None, id_service: bool = True):
+        """
+        Initialize a mesh that is not running yet.
+
+        Args:
+            nodes (List[RouterNode]): The routers to run on this host.
+            use_zenohd (bool, optional): Run ``zenohd`` rather than Python
+                routers; defaults to whether ``zenohd`` is on the ``PATH``.
+            config_dir (str, optional): Directory for the generated
+                configurations; a temporary one by default.
+            id_service (bool): Run an ID service replica for each router.
+        """
+        self.nodes = nodes
+        self.use_zenohd = shutil.which("zenohd") is not None if use_zenohd is None else use_zenohd
+        self.config_dir = config_dir or tempfile.mkdtemp(prefix="navis_mesh_")
+        self.id_services = ([IDService(partition=node.partition, router=node.endpoint)
+                             for node in nodes] if id_service else [])
+        self._processes = {}
+        self._started = {}
+        self._restart_delay = {node.name: 1.0 for node in nodes}
+        self._stop = threading.Event()
+        self._supervisor = None
+
+    def _command(self, node: RouterNode) -> List[str]:
+        """Return the command line running a node's router."""
+        config_path = os.path.join(self.config_dir, f"{node.name}.json5")
+        node.write_config(config_path)
+        if self.use_zenohd:
+            return ["zenohd", "-c", config_path]
+        return [sys.executable, "-m", "navis.mesh", config_path]
+
+    def _spawn(self, node: RouterNode):
+        """Start a node's router and stream its output."""
+        process = subprocess.Popen(self._command(node), stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self._processes[node.name] = process
+        self._started[node.name] = time.monotonic()
+        print(f"[Router:{node.name}] Started on {', '.join(node.listen)} (PID: {process.pid})")
+        threading.Thread(target=self._stream, args=(node.name, process), daemon=True).start()
+
+    @staticmethod
+    def _stream(name: str, process: subprocess.Popen):
+        """Print a router's output line by line."""
+        for line in process.stdout:
+            print(f"[zenohd:{name}] {line.rstrip()}")
+
+    def _supervise(self):
+        """Restart routers that exit until the mesh is stopped."""
+        restart_at = {}
+        while not self._stop.wait(0.5):
+            now = time.monotonic()
+            for node in self.nodes:
+                process = self._processes[node.name]
+                if process.poll() is None:
+                    if now - self._started[node.name] > 30.0:
+                        self._restart_delay[node.name] = 1.0  # Stable again.
+                    continue
+                if node.name not in restart_at:
+                    delay = self._restart_delay[node.name]
+                    print(f"[Router:{node.name}] Exited with code {process.returncode}, "
+                          f"restarting in {delay:g}s")
+                    restart_at[node.name] = now + delay
+                    self._restart_delay[node.name] = min(delay * 2, 30.0)
+                elif now >= restart_at[node.name]:
+                    del restart_at[node.name]
+                    self._spawn(node)
+
+    def start(self):
+        """Start the routers, wait for them to initialize, then start the ID services."""
+        print(f"[·_·] Launching {len(self.nodes)} router(s) "
+              f"({'zenohd' if self.use_zenohd else 'Python routers'}), configs in '{self.config_dir}'")
+        for node in self.nodes:
+            self._spawn(node)
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+        time.sleep(2)
+        for id_service in self.id_services:
+            id_service.start()
+
+    def stop(self):
+        """Stop the ID services and terminate the routers."""
+        self._stop.set()
+        if self._supervisor:
+            self._supervisor.join()
+        for id_service in self.id_services:
+            id_service.stop()
+        for process in self._processes.values():
+            process.terminate()
+        for process in self._processes.values():
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
 def main():
     """
     Main entry point for the Navis Router.
 
     Starts the Zenoh router in a background thread, initializes the
-    ID service, and keeps the services running until interrupted.
+    ID service, and keeps the services running until interrupted. With
+    mesh options, launches and supervises a ``RouterMesh`` instead.
     """
+    parser = argparse.ArgumentParser(description="Navis Router")
+    parser.add_argument(
+        "--routers", type=int, default=None,
+        help="Launch a local mesh of this many routers on consecutive ports")
+    parser.add_argument(
+        "--base-port", type=int, default=DEFAULT_PORT,
+        help="Port of the first router of a local mesh")
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1",
+        help="Address the routers of a local mesh listen on")
+    parser.add_argument(
+        "--listen", type=str, default=None, metavar="ENDPOINT",
+        help="Run one mesh router listening on this endpoint (e.g., tcp/0.0.0.0:7447)")
+    parser.add_argument(
+        "--connect", type=str, action="append", default=[], metavar="ENDPOINT",
+        help="Endpoint of another mesh router to connect to (repeatable)")
+    parser.add_argument(
+        "--partition", type=int, default=0,
+        help="ID service partition of the first of N consecutive partitions used by "
+             "--routers N (partitions P to P+N-1); ranges must not overlap across hosts")
+    args = parser.parse_args()
+
+    if args.routers is not None or args.listen is not None:
+        if args.listen is not None:
+            nodes = [RouterNode(name=f"router-{args.partition}", listen=[args.listen],
+                                connect=args.connect, partition=args.partition)]
+        else:
+            nodes = local_mesh(args.routers, args.base_port, args.host, args.partition)
+            nodes[0].connect.extend(args.connect)
+        mesh = RouterMesh(nodes)
+        mesh.start()
+        print("Navis Router Mesh Ready")
+        for node in nodes:
+            print(f"  - {node.name}: {node.endpoint} (ID partition {node.partition})")
+        print("\nPress Ctrl+C to stop")
+        print()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n[·_·] Shutting down...")
+            mesh.stop()
+            print("[·_·] Stopped")
+        return
+
     print("[·_·]Navis Router - Starting...")
     print()
 
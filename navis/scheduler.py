@@ -0,0 +1,125 @@
+"""
+Navis Scheduler
+===============
+
+Hashed timer wheel for driving many periodic tasks from one thread.
+
+Scheduling and cancelling a timer are O(1), and each tick only looks at
+the timers hashed into its slot, so thousands of publisher tasks can share
+a single thread without a per-task sleep or a sorted queue.
+"""
+import threading
+import time
+from typing import Callable, List
+
+
+class Timer:
+    """
+    Handle of a scheduled callback.
+
+    Attributes:
+        due (int): Absolute tick at which the callback runs.
+        callback (Callable): Function called with no arguments.
+        cancelled (bool): Whether the timer was cancelled.
+    """
+    __slots__ = ("due", "callback", "cancelled")
+
+    def __init__(self, due: int, callback: Callable):
+        self.due = due
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        """Prevent the callback from running."""
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel with a fixed tick.
+
+    Timers are hashed into ``slots`` buckets by their due tick. Timers due
+    more than one revolution ahead stay in their bucket until their tick
+    comes around.
+
+    Attributes:
+        tick_seconds (float): Duration of one tick; the timing resolution.
+    """
+
+    def __init__(self, tick_seconds: float = 0.01, slots: int = 512):
+        """
+        Initialize an empty wheel.
+
+        Args:
+            tick_seconds (float): Duration of one tick in seconds.
+            slots (int): Number of buckets.
+        """
+        if tick_seconds <= 0 or slots <= 0:
+            raise ValueError("tick_seconds and slots must be positive.")
+        self.tick_seconds = tick_seconds
+        self._slots: List[List[Timer]] = [[] for _ in range(slots)]
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def schedule(self, delay_seconds: float, callback: Callable) -> Timer:
+        """
+        Run ``callback`` after ``delay_seconds``, rounded up to whole ticks.
+
+        Args:
+            delay_seconds (float): Delay from the current tick.
+            callback (Callable): Function called with no arguments.
+
+        Returns:
+            Timer: A handle that can cancel the callback.
+        """
+        ticks = max(1, -int(-delay_seconds // self.tick_seconds))
+        with self._lock:
+            timer = Timer(self._tick + ticks, callback)
+            self._slots[timer.due % len(self._slots)].append(timer)
+        return timer
+
+    def advance(self) -> int:
+        """
+        Move the wheel forward one tick and run the callbacks now due.
+
+        Exceptions raised by callbacks are printed and do not stop the wheel.
+
+        Returns:
+            int: Number of callbacks run.
+        """
+        with self._lock:
+            self._tick += 1
+            index = self._tick % len(self._slots)
+            bucket = self._slots[index]
+            due = [t for t in bucket if t.due <= self._tick]
+            if due:
+                self._slots[index] = [t for t in bucket if t.due > self._tick]
+        ran = 0
+        for timer in due:
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback()
+            except Exception as e:
+                print(f"[Scheduler] Timer callback error: {e}")
+            ran += 1
+        return ran
+
+    def run(self, stop_event: threading.Event):
+        """
+        Advance the wheel in real time until ``stop_event`` is set.
+
+        Ticks missed while callbacks were running are caught up at once, so
+        timers keep their average rate even when a tick runs long.
+
+        Args:
+            stop_event (threading.Event): Event that stops the loop.
+        """
+        start = time.monotonic()
+        done = 0
+        while not stop_event.is_set():
+            target = int((time.monotonic() - start) / self.tick_seconds)
+            while done < target:
+                self.advance()
+                done += 1
+            stop_event.wait(start + (done + 1) * self.tick_seconds - time.monotonic())
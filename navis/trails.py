@@ -0,0 +1,232 @@
+"""
+Navis Pose Trails
+=================
+
+Fixed-capacity pose history and display-aware decimation for trails.
+
+Each robot's trail is stored in a ``PoseHistory``: a NumPy ring buffer
+with a fixed number of rows, so memory use does not grow with the time a
+robot has been tracked. Before drawing, a history is reduced to roughly
+one point per horizontal screen pixel by min/max decimation. The history
+keeps the extremes of each bucket of poses up to date as poses are
+appended, so both drawing and decimating cost depend on the size of the
+plot and not on the length of the trail. ``decimate_minmax`` applies the
+same reduction to any polyline.
+"""
+import numpy as np
+
+
+class PoseHistory:
+    """
+    Ring buffer holding the most recent poses of a single robot.
+
+    Rows are stored as ``(t, x, y)``. Once ``capacity`` rows have been
+    appended, each new pose overwrites the oldest one.
+
+    Once ``points`` has been called with a ``max_points`` bound, the history
+    is split into buckets of consecutive poses and the poses with the
+    minimum and maximum ``x`` and ``y`` of each bucket are tracked on
+    ``append``. Decimated points are then read from those extremes, without
+    scanning the stored poses.
+
+    Attributes:
+        capacity (int): Maximum number of poses kept.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize an empty history.
+
+        Args:
+            capacity (int): Maximum number of poses kept (must be positive).
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be a positive integer.")
+        self.capacity = capacity
+        self._data = np.empty((capacity, 3), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        # Poses appended since the last clear; pose ``i`` is stored in row
+        # ``i % capacity``.
+        self._count = 0
+        # Bucket extremes, sized for ``_decimation`` points (None until used).
+        self._decimation = None
+        self._bucket_size = 0
+        self._extremes = np.zeros((0, 4), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, t: float, x: float, y: float):
+        """
+        Append a pose, overwriting the oldest one when full.
+
+        Args:
+            t (float): Time of the pose in seconds.
+            x (float): X position.
+            y (float): Y position.
+        """
+        self._data[self._next] = (t, x, y)
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        index = self._count
+        self._count += 1
+        if self._decimation is None:
+            return
+
+        # Update the extremes of the bucket the pose falls into.
+        extremes = self._extremes[(index // self._bucket_size) % len(self._extremes)]
+        if index % self._bucket_size == 0:
+            extremes[:] = (index, index, index, index)
+            return
+        data, capacity = self._data, self.capacity
+        if x < data[extremes[0] % capacity, 1]:
+            extremes[0] = index
+        if x > data[extremes[1] % capacity, 1]:
+            extremes[1] = index
+        if y < data[extremes[2] % capacity, 2]:
+            extremes[2] = index
+        if y > data[extremes[3] % capacity, 2]:
+            extremes[3] = index
+
+    def clear(self):
+        """Drop all stored poses."""
+        self._next = 0
+        self._size = 0
+        self._count = 0
+        self._decimation = None
+
+    def array(self) -> np.ndarray:
+        """
+        Return the stored poses in chronological order.
+
+        Returns:
+            np.ndarray: A new ``(n, 3)`` array of ``(t, x, y)`` rows.
+        """
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def points(self, max_points: int = None) -> np.ndarray:
+        """
+        Return the trail as ``(x, y)`` points, optionally decimated.
+
+        Decimation keeps, for each bucket of consecutive poses, the ones
+        with the minimum and maximum ``x`` and ``y``, like
+        ``decimate_minmax``, plus the oldest and latest poses. Its cost
+        depends on ``max_points`` only. Changing ``max_points`` (e.g., when
+        the plot is resized) rebuilds the buckets once.
+
+        Args:
+            max_points (int, optional): Upper bound on the number of
+                returned points (at least 2). ``None`` returns every stored
+                pose.
+
+        Returns:
+            np.ndarray: An ``(m, 2)`` array of ``(x, y)`` points.
+        """
+        if max_points is None:
+            return self.array()[:, 1:]
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2.")
+        if max_points >= 10 and max_points != self._decimation:
+            self._rebuild(max_points)
+        if self._size <= max_points:
+            return self.array()[:, 1:]
+
+        first, last = self._count - self._size, self._count - 1
+        if max_points < 10:
+            keep = np.linspace(first, last, max_points).astype(np.int64)
+        else:
+            size = self._bucket_size
+            buckets = np.arange(first // size, last // size + 1) % len(self._extremes)
+            picks = self._extremes[buckets].ravel()
+            # The oldest bucket may have lost some of its poses to the ring.
+            picks = picks[picks >= first]
+            keep = np.unique(np.concatenate(([first], picks, [last])))
+        return self._data[keep % self.capacity, 1:]
+
+    def _rebuild(self, max_points: int):
+        """Size the buckets for ``max_points`` and recompute their extremes."""
+        # The stored poses span at most one bucket more than fit in the
+        # capacity, each contributing up to four points, plus the two ends.
+        n_buckets = (max_points - 2) // 4 - 1
+        size = -(-self.capacity // n_buckets)
+        self._decimation = max_points
+        self._bucket_size = size
+        self._extremes = np.zeros((n_buckets + 2, 4), dtype=np.int64)
+        if not self._size:
+            return
+
+        # Pad the poses at both ends, repeating the end poses, so buckets
+        # align with pose indices. Clipping maps a padded pick back to the
+        # pose it repeats.
+        first = self._count - self._size
+        lead = first % size
+        xy = self.array()[:, 1:]
+        tail = -(lead + len(xy)) % size
+        xy = np.concatenate((np.repeat(xy[:1], lead, axis=0), xy,
+                             np.repeat(xy[-1:], tail, axis=0)))
+        buckets = xy.reshape(-1, size, 2)
+        offsets = first - lead + np.arange(len(buckets))[:, np.newaxis] * size
+        picks = offsets + np.stack((
+            buckets[:, :, 0].argmin(axis=1),
+            buckets[:, :, 0].argmax(axis=1),
+            buckets[:, :, 1].argmin(axis=1),
+            buckets[:, :, 1].argmax(axis=1),
+        ), axis=1)
+        first_bucket = (first - lead) // size
+        slots = np.arange(first_bucket, first_bucket + len(buckets)) % len(self._extremes)
+        self._extremes[slots] = np.clip(picks, first, self._count - 1)
+
+
+def decimate_minmax(points: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Reduce a polyline to at most ``max_points`` points, keeping its extremes.
+
+    The polyline is split into equally sized buckets of consecutive points.
+    From each bucket the points with the minimum and maximum ``x`` and
+    ``y`` are kept, in their original order, so sharp turns and the overall
+    extent of the path survive decimation. The first and last points are
+    always kept so the trail ends at the latest pose.
+
+    Args:
+        points (np.ndarray): An ``(n, 2)`` array of ``(x, y)`` points.
+        max_points (int): Upper bound on the number of returned points
+            (at least 2).
+
+    Returns:
+        np.ndarray: The decimated ``(m, 2)`` array, with ``m <= max_points``.
+            The input is returned unchanged when it is already small enough.
+    """
+    if max_points < 2:
+        raise ValueError("max_points must be at least 2.")
+    n = len(points)
+    if n <= max_points:
+        return points
+    if max_points < 6:
+        return points[np.linspace(0, n - 1, max_points).astype(np.intp)]
+
+    # Up to four points are kept per bucket, plus the first and last points.
+    n_buckets = (max_points - 2) // 4
+    bucket_size = -(-(n - 1) // n_buckets)
+    n_buckets = -(-(n - 1) // bucket_size)
+    padded = n_buckets * bucket_size
+
+    # Pad the last bucket by repeating its final point so the data reshapes.
+    body = points[:n - 1]
+    if padded > n - 1:
+        body = np.concatenate((body, np.repeat(body[-1:], padded - (n - 1), axis=0)))
+    buckets = body.reshape(n_buckets, bucket_size, 2)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    picks = np.stack((
+        offsets + buckets[:, :, 0].argmin(axis=1),
+        offsets + buckets[:, :, 0].argmax(axis=1),
+        offsets + buckets[:, :, 1].argmin(axis=1),
+        offsets + buckets[:, :, 1].argmax(axis=1),
+    ), axis=1).ravel()
+    picks = np.minimum(picks, n - 2)
+    keep = np.unique(np.concatenate(([0], picks, [n - 1])))
+    return points[keep]
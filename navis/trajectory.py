@@ -0,0 +1,203 @@
+"""
+Navis Trajectories
+==================
+
+Upload a whole timed path as one command and execute it on the device.
+
+Driving a path by sending one ``Move`` per segment from the controller
+makes segment timing depend on network jitter and controller wakeups, and
+a single lost command ruins the path. A ``Trajectory`` carries all the
+timed setpoints at once; the device's ``TrajectoryExecutor`` dispatches
+them on its own monotonic clock and reports ``TrajectoryProgress``.
+
+Key abstractions:
+    - ``velocity_trajectory``: Build a trajectory from ``(v, omega,
+      duration)`` segments.
+    - ``TrajectoryExecutor``: Feeds the setpoints of one trajectory at a
+      time to ``dispatch_command``, with cancellation and preemption.
+"""
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from navis.messages import (
+    Move,
+    PoseSetpoint,
+    Trajectory,
+    TrajectoryProgress,
+    Waypoint,
+)
+
+
+def velocity_trajectory(segments: List[Tuple[float, float, float]],
+                        trajectory_id: str = None) -> Trajectory:
+    """
+    Build a velocity trajectory from consecutive segments.
+
+    Args:
+        segments (List[Tuple[float, float, float]]): ``(v, omega, duration)``
+            of each segment, in order.
+        trajectory_id (str, optional): ID of the trajectory; a random one
+            is generated if omitted.
+
+    Returns:
+        Trajectory: One waypoint per segment plus a final stop waypoint.
+    """
+    waypoints, t = [], 0.0
+    for v, omega, duration in segments:
+        waypoints.append(Waypoint(t=t, v=v, omega=omega))
+        t += duration
+    waypoints.append(Waypoint(t=t))
+    return Trajectory(trajectory_id=trajectory_id or uuid.uuid4().hex[:8], waypoints=waypoints)
+
+
+class TrajectoryExecutor:
+    """
+    Execute trajectories by dispatching their setpoints on time.
+
+    One trajectory runs at a time, on its own thread. Executing a new
+    trajectory preempts the running one; so does ``preempt()``, which
+    ``DeviceClient`` calls when a ``Move`` arrives directly. Velocity
+    trajectories that are stopped early dispatch a stop ``Move``.
+    """
+
+    def __init__(self, dispatch: Callable, on_progress: Callable = None,
+                 progress_interval: float = 0.5):
+        """
+        Initialize an idle executor.
+
+        Args:
+            dispatch (Callable): Called with each setpoint command,
+                typically the device's ``dispatch_command``.
+            on_progress (Callable, optional): Called with a
+                ``TrajectoryProgress`` on start, every ``progress_interval``
+                seconds while running, and when the trajectory ends.
+            progress_interval (float): Period of the running reports.
+        """
+        self._dispatch = dispatch
+        self._on_progress = on_progress
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._trajectory: Optional[Trajectory] = None
+        self._stop: Optional[threading.Event] = None
+        self._stop_status = ""
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> Optional[str]:
+        """ID of the running trajectory, or ``None`` when idle."""
+        with self._lock:
+            return self._trajectory.trajectory_id if self._trajectory is not None else None
+
+    def execute(self, trajectory: Trajectory):
+        """
+        Start executing a trajectory, preempting the running one.
+
+        Args:
+            trajectory (Trajectory): The trajectory to run, starting now.
+
+        Raises:
+            ValueError: If the trajectory has no waypoints, or both velocity
+                and pose waypoints.
+        """
+        if bool(trajectory.waypoints) == bool(trajectory.poses):
+            raise ValueError("A trajectory needs either velocity waypoints or poses.")
+        self._stop_running("preempted", send_stop=False)
+        stop = threading.Event()
+        with self._lock:
+            self._trajectory = trajectory
+            self._stop = stop
+            self._thread = threading.Thread(target=self._run, args=(trajectory, stop), daemon=True)
+            self._thread.start()
+
+    def cancel(self, trajectory_id: str = "") -> bool:
+        """
+        Stop the running trajectory.
+
+        Args:
+            trajectory_id (str): Only cancel the trajectory with this ID;
+                an empty ID cancels whatever is running.
+
+        Returns:
+            bool: Whether a trajectory was cancelled.
+        """
+        return self._stop_running("cancelled", only=trajectory_id)
+
+    def preempt(self) -> bool:
+        """
+        Stop the running trajectory because another command took over.
+
+        Returns:
+            bool: Whether a trajectory was running.
+        """
+        return self._stop_running("preempted", send_stop=False)
+
+    def _stop_running(self, status: str, only: str = "", send_stop: bool = True) -> bool:
+        """Stop the running trajectory, reporting ``status``, and wait for its thread."""
+        with self._lock:
+            trajectory, stop, thread = self._trajectory, self._stop, self._thread
+            if trajectory is None or (only and trajectory.trajectory_id != only):
+                return False
+            self._stop_status = status
+            self._trajectory = None
+            stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        if send_stop and trajectory.waypoints:
+            self._dispatch(Move())
+        return True
+
+    def _report(self, trajectory: Trajectory, status: str, completed: int, total: int,
+                start: float, error: str = ""):
+        """Send a progress report, if anyone listens."""
+        if self._on_progress is None:
+            return
+        try:
+            self._on_progress(TrajectoryProgress(
+                trajectory_id=trajectory.trajectory_id, status=status, completed=completed,
+                total=total, elapsed=time.monotonic() - start, error=error))
+        except Exception as e:
+            print(f"[Trajectory:{trajectory.trajectory_id}] Progress report failed: {e}")
+
+    def _run(self, trajectory: Trajectory, stop: threading.Event):
+        """Dispatch each setpoint at its time until done or stopped."""
+        if trajectory.waypoints:
+            setpoints = [(w.t, Move(v=w.v, omega=w.omega)) for w in trajectory.waypoints]
+        else:
+            setpoints = [(p.t, PoseSetpoint(x=p.x, y=p.y, theta=p.theta)) for p in trajectory.poses]
+        setpoints.sort(key=lambda setpoint: setpoint[0])
+        total = len(setpoints)
+        start = time.monotonic()
+        next_report = start + self.progress_interval
+        self._report(trajectory, "running", 0, total, start)
+
+        for completed, (t, command) in enumerate(setpoints):
+            due = start + t
+            # Wake up for progress reports while waiting for the setpoint.
+            while (now := time.monotonic()) < due:
+                if stop.wait(min(due, next_report) - now):
+                    break
+                if time.monotonic() >= next_report:
+                    self._report(trajectory, "running", completed, total, start)
+                    next_report += self.progress_interval
+            if stop.is_set():
+                self._report(trajectory, self._stop_status, completed, total, start)
+                return
+            try:
+                self._dispatch(command)
+            except Exception as e:
+                with self._lock:
+                    if self._trajectory is trajectory:
+                        self._trajectory = None
+                self._report(trajectory, "failed", completed, total, start, error=str(e))
+                return
+
+        with self._lock:
+            if self._trajectory is trajectory:
+                self._trajectory = None
+        self._report(trajectory, "completed", total, total, start)
+
+    def close(self):
+        """Cancel the running trajectory, if any."""
+        self.cancel()
@@ -0,0 +1,368 @@
+"""
+Navis Payload Transport
+=======================
+
+Helpers for moving message payloads between Zenoh and the decoders.
+
+Two paths are provided:
+
+    - ``payload_buffer``: Gives decoders a view of a Zenoh payload without
+      building an intermediate ``bytes`` object when the payload type
+      supports the buffer protocol.
+    - Shared memory: For processes on the same host, a publisher can write
+      large payloads into a shared-memory ring (``SharedMemoryWriter``) and
+      send only a small ``ShmRef`` over Zenoh. Subscribers then decode
+      straight from the shared segment through a ``memoryview``
+      (``SharedMemoryReader``), so the payload is never copied by the
+      network stack or on reception.
+
+The released ``eclipse-zenoh`` wheels do not expose Zenoh's own SHM provider
+to Python, so the shared segments are managed with
+``multiprocessing.shared_memory``. Shared-memory references only resolve on
+the host that wrote them; enable the shared-memory path only when every
+consumer of those topics runs on the same machine.
+"""
+import os
+import secrets
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+import msgspec
+import zenoh
+
+# Zenoh encoding marking a payload that is an encoded ``ShmRef``.
+SHM_ENCODING = "navis/shm"
+
+# Payloads smaller than this are cheaper to send inline.
+DEFAULT_SHM_THRESHOLD = 64 * 1024
+
+_SLOT_HEADER = struct.Struct("<Q")
+_HOSTNAME = socket.gethostname()
+
+
+def _supports_buffer_protocol() -> bool:
+    """Return whether ``ZBytes`` can be viewed without copying."""
+    try:
+        memoryview(zenoh.ZBytes(b"navis"))
+        return True
+    except TypeError:
+        return False
+
+
+_ZBYTES_HAS_BUFFER = _supports_buffer_protocol()
+
+
+def payload_buffer(payload):
+    """
+    Return a buffer over a Zenoh payload suitable for ``msgspec`` decoders.
+
+    Args:
+        payload (zenoh.ZBytes): The payload of a sample, query or reply.
+
+    Returns:
+        A ``memoryview`` of the payload when ``ZBytes`` supports the buffer
+        protocol, otherwise its ``bytes``.
+    """
+    if _ZBYTES_HAS_BUFFER:
+        return memoryview(payload)
+    return payload.to_bytes()
+
+
+class ShmRef(msgspec.Struct, array_like=True):
+    """
+    Reference to a payload stored in a shared-memory slot.
+
+    Attributes:
+        host (str): Host name of the writer.
+        segment (str): Name of the shared-memory segment.
+        offset (int): Byte offset of the payload within the segment.
+        length (int): Payload length in bytes.
+        seq (int): Slot sequence number the payload was written with.
+    """
+    host: str
+    segment: str
+    offset: int
+    length: int
+    seq: int
+
+
+class SharedMemoryWriter:
+    """
+    Ring of fixed-size shared-memory slots written by a single publisher.
+
+    Each slot starts with a sequence number used as a seqlock: it is odd
+    while the slot is being written and even once the payload is complete.
+    Readers compare it against the ``ShmRef`` they received to detect a slot
+    that was overwritten before they finished decoding.
+
+    Attributes:
+        slots (int): Number of slots in the ring.
+        slot_size (int): Maximum payload size per slot, in bytes.
+    """
+
+    def __init__(self, slots: int = 8, slot_size: int = 1024 * 1024):
+        """
+        Create the shared-memory segment.
+
+        Args:
+            slots (int): Number of payloads that can be in flight at once.
+            slot_size (int): Initial maximum payload size. The segment is
+                recreated with larger slots when a bigger payload is written.
+        """
+        if slots <= 0 or slot_size <= 0:
+            raise ValueError("slots and slot_size must be positive.")
+        self.slots = slots
+        self.slot_size = slot_size
+        self._lock = threading.Lock()
+        self._next_slot = 0
+        self._seq = 0
+        self._shm = None
+        # Replaced segments with the sequence number they were retired at.
+        self._retired = []
+        self._allocate(slot_size)
+
+    def _allocate(self, slot_size: int):
+        """Create a new segment whose slots hold ``slot_size`` bytes."""
+        name = f"navis_{os.getpid()}_{secrets.token_hex(4)}"
+        stride = _SLOT_HEADER.size + slot_size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=stride * self.slots)
+        if self._shm is not None:
+            # References to the old segment may still be in flight, and
+            # readers attach by name; keep it until the new ring has been
+            # written around once (see ``_release_retired``).
+            self._retired.append((self._shm, self._seq))
+        self._shm = shm
+        self.slot_size = slot_size
+        self._next_slot = 0
+
+    def reserve(self, slots: int):
+        """
+        Grow the ring to at least ``slots`` slots.
+
+        Publishers sending a message as several payloads reserve one slot
+        per payload, so that none is overwritten before the last is sent.
+
+        Args:
+            slots (int): Minimum number of slots.
+        """
+        with self._lock:
+            if slots > self.slots:
+                self.slots = slots
+                self._allocate(self.slot_size)
+
+    def write(self, data) -> ShmRef:
+        """
+        Copy a payload into the next slot.
+
+        Args:
+            data: Any bytes-like object.
+
+        Returns:
+            ShmRef: A reference to send to readers in place of the payload.
+        """
+        length = len(data)
+        with self._lock:
+            if length > self.slot_size:
+                self._allocate(1 << (length - 1).bit_length())
+            stride = _SLOT_HEADER.size + self.slot_size
+            base = self._next_slot * stride
+            self._next_slot = (self._next_slot + 1) % self.slots
+
+            buf = self._shm.buf
+            self._seq += 2
+            _SLOT_HEADER.pack_into(buf, base, self._seq - 1)
+            start = base + _SLOT_HEADER.size
+            buf[start:start + length] = data
+            _SLOT_HEADER.pack_into(buf, base, self._seq)
+            if self._retired:
+                self._release_retired()
+            return ShmRef(host=_HOSTNAME, segment=self._shm.name,
+                          offset=start, length=length, seq=self._seq)
+
+    def _release_retired(self):
+        """Remove retired segments once a full ring revolution has passed."""
+        # Each write advances the sequence number by 2.
+        revolution = 2 * self.slots
+        while self._retired and self._seq - self._retired[0][1] >= revolution:
+            shm, _ = self._retired.pop(0)
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Release and remove the shared-memory segments."""
+        with self._lock:
+            for shm, _ in self._retired:
+                shm.close()
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self._retired.clear()
+            if self._shm is not None:
+                self._shm.close()
+                try:
+                    self._shm.unlink()
+                except FileNotFoundError:
+                    pass
+                self._shm = None
+
+
+class SharedMemoryReader:
+    """
+    Resolve ``ShmRef`` references and decode them in place.
+
+    Segments are attached on first use. Writers replace their segment when
+    they restart or grow, so a long-running reader detaches segments that
+    have not been read for ``idle_seconds``, and the least recently used
+    ones beyond ``max_segments``.
+    """
+
+    def __init__(self, max_segments: int = 16, idle_seconds: float = 10.0):
+        """
+        Initialize a reader with no attached segments.
+
+        Args:
+            max_segments (int): Maximum number of segments kept attached.
+            idle_seconds (float): Detach segments not read for this long.
+        """
+        self.max_segments = max_segments
+        self.idle_seconds = idle_seconds
+        # Segment name -> (segment, time of last use), least recent first.
+        self._segments: OrderedDict = OrderedDict()
+        # Detached segments still exported to decoded messages.
+        self._detached = []
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _segment(self, name: str) -> shared_memory.SharedMemory:
+        """Return the attached segment called ``name``, attaching it if needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._segments.pop(name, None)
+            if entry is None:
+                try:
+                    shm = shared_memory.SharedMemory(name=name, track=False)
+                except FileNotFoundError:
+                    raise RuntimeError(
+                        f"Shared-memory segment '{name}' no longer exists.") from None
+            else:
+                shm = entry[0]
+            self._segments[name] = (shm, now)
+            if entry is None or now - self._last_sweep >= 1.0:
+                self._sweep(now)
+            return shm
+
+    def _sweep(self, now: float):
+        """Detach idle and least recently used segments."""
+        self._last_sweep = now
+        while self._segments:
+            name, (shm, last_use) = next(iter(self._segments.items()))
+            if len(self._segments) <= self.max_segments and now - last_use < self.idle_seconds:
+                break
+            del self._segments[name]
+            self._detached.append(shm)
+        self._detached = [shm for shm in self._detached if not self._close(shm)]
+
+    @staticmethod
+    def _close(shm: shared_memory.SharedMemory) -> bool:
+        """Unmap a segment, returning ``False`` while views of it are alive."""
+        try:
+            shm.close()
+            return True
+        except BufferError:
+            # A decoded message still holds a view into the segment; retry
+            # on a later sweep, once that view has been collected.
+            return False
+
+    def read(self, ref: ShmRef, decode: Callable):
+        """
+        Decode the payload a reference points to, without copying it.
+
+        Args:
+            ref (ShmRef): The reference received over Zenoh.
+            decode (Callable): Function decoding a bytes-like object, such as
+                ``msgspec.msgpack.Decoder.decode``. Decoded ``memoryview``
+                fields keep pointing into the slot, which is reused after
+                ``slots`` further writes.
+
+        Returns:
+            The decoded object.
+
+        Raises:
+            RuntimeError: If the reference was written on another host, its
+                segment was removed, or the slot was overwritten while
+                decoding.
+        """
+        if ref.host != _HOSTNAME:
+            raise RuntimeError(
+                f"Shared-memory payload from host '{ref.host}' cannot be read on '{_HOSTNAME}'.")
+        buf = self._segment(ref.segment).buf
+        header = ref.offset - _SLOT_HEADER.size
+        if _SLOT_HEADER.unpack_from(buf, header)[0] != ref.seq:
+            raise RuntimeError("Shared-memory slot was overwritten before it was read.")
+        result = decode(buf[ref.offset:ref.offset + ref.length])
+        if _SLOT_HEADER.unpack_from(buf, header)[0] != ref.seq:
+            raise RuntimeError("Shared-memory slot was overwritten while it was read.")
+        return result
+
+    def close(self):
+        """Detach from all segments."""
+        with self._lock:
+            for shm, _ in self._segments.values():
+                self._close(shm)
+            for shm in self._detached:
+                self._close(shm)
+            self._segments.clear()
+            self._detached.clear()
+
+
+_REF_ENCODER = msgspec.msgpack.Encoder()
+_REF_DECODER = msgspec.msgpack.Decoder(ShmRef)
+_DEFAULT_READER: Optional[SharedMemoryReader] = None
+_DEFAULT_READER_LOCK = threading.Lock()
+
+
+def _default_reader() -> SharedMemoryReader:
+    """Return the process-wide reader, creating it on first use."""
+    global _DEFAULT_READER
+    with _DEFAULT_READER_LOCK:
+        if _DEFAULT_READER is None:
+            _DEFAULT_READER = SharedMemoryReader()
+        return _DEFAULT_READER
+
+
+def encode_ref(ref: ShmRef) -> bytes:
+    """Encode a ``ShmRef`` for sending with ``SHM_ENCODING``."""
+    return _REF_ENCODER.encode(ref)
+
+
+def is_shm_sample(sample) -> bool:
+    """Return whether a sample carries a ``ShmRef`` instead of a payload."""
+    return str(sample.encoding) == SHM_ENCODING
+
+
+def decode_payload(sample, decode: Callable, reader: SharedMemoryReader = None):
+    """
+    Decode a sample's payload, following shared-memory references.
+
+    Args:
+        sample: A Zenoh sample (or query) with ``payload`` and ``encoding``.
+        decode (Callable): Function decoding a bytes-like object.
+        reader (SharedMemoryReader, optional): Reader used for shared-memory
+            references. Defaults to a process-wide reader.
+
+    Returns:
+        The decoded object.
+    """
+    if is_shm_sample(sample):
+        ref = _REF_DECODER.decode(payload_buffer(sample.payload))
+        return (reader or _default_reader()).read(ref, decode)
+    return decode(payload_buffer(sample.payload))
@@ -3,77 +3,147 @@ Navis Multi-Robot Visualizer
 ==================================
 
 Visualizes the live state of all robots in the arena using Zenoh Pub/Sub.
-Discovers and displays robots automatically by listening to wildcard topics.
+Discovers and displays robots automatically by listening to wildcard topics,
+draining all measurements received since the last frame through a
+``FleetObserver``.
+
+With ``--trail-length N`` each robot also leaves a trail of its last ``N``
+poses, decimated to the width of the plot before drawing.
+
+Measurements that arrive out of order are discarded, and robots losing
+measurements show their loss rate in the legend.
+
+Between measurements, robots are drawn at the pose dead-reckoned from
+their last measurement and velocity (disable with ``--no-predict``).
+
+``--record FILE`` saves every received pose to a recording, and
+``--render FILE`` turns a recording into a video without a display (see
+``navis.render``).
 """
 
 import argparse
 import math
-import threading
-from collections import defaultdict
+import time
 
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-import msgspec
-import zenoh
-from zenoh import Config
+from matplotlib.collections import LineCollection
 
 from navis.messages import Measurement  # Assuming this is accessible
+from navis.trails import PoseHistory
+from navis.categories import ROBOTS
+from navis.observer import FleetObserver
+from navis.prediction import FleetPredictor
+from navis.recording import PoseRecorder
 
 # --- Global State Management ---
-# A thread-safe dictionary to store the latest state of each robot.
-# Format: { "robot_id": {"x": float, "y": float, "theta": float}, ... }
-ROBOT_STATES = defaultdict(dict)
-STATE_LOCK = threading.Lock()
+# Measurements are drained from the observer once per animation frame, so
+# the drawing thread owns all of the state below and no lock is needed.
+OBSERVER = None
 
-# Decoder for incoming measurement messages
-DECODER = msgspec.msgpack.Decoder(Measurement)
+# Pose history of each robot.
+# Format: { "robot_id": PoseHistory, ... }. Stays empty when trails are off.
+ROBOT_TRAILS = {}
+TRAIL_LENGTH = 0
 
+# Extrapolates every robot's pose between measurements; ``None`` when disabled.
+PREDICTOR = None
 
-def measurement_listener(sample):
-    """
-    Callback to update the shared state when a new measurement arrives.
-    This function is called by the Zenoh subscriber thread.
-    """
-    try:
-        # Extract robot_id from the topic key (e.g., "navis/robots/robot001/measurement")
-        robot_id = str(sample.key_expr).split("/")[2]
-        meas = DECODER.decode(bytes(sample.payload))
+# Recording of the received poses, when ``--record`` is given.
+RECORDER = None
 
-        with STATE_LOCK:
-            ROBOT_STATES[robot_id] = {
-                "x": meas.x,
-                "y": meas.y,
-                "theta": meas.theta
-            }
 
-        # Log for debugging
-        print(f"[VISUALIZER] Updated {robot_id}: x={
-              meas.x:.2f}, y={meas.y:.2f}")
+def ingest(batch):
+    """
+    Apply a batch of new measurements to the trails, predictor and recording.
 
-    except Exception as e:
-        print(f"[ERROR] Failed to process measurement on '{
-              sample.key_expr}': {e}")
+    Args:
+        batch (ObservationBatch): Measurements drained from the observer.
+    """
+    if not len(batch):
+        return
+    xs, ys, thetas = batch["x"], batch["y"], batch["theta"]
+    vs, omegas = batch["v"], batch["omega"]
+    for i, robot_id in enumerate(batch.device_ids):
+        stamp = batch.stamps[i]
+        if TRAIL_LENGTH > 0:
+            trail = ROBOT_TRAILS.get(robot_id)
+            if trail is None:
+                trail = ROBOT_TRAILS[robot_id] = PoseHistory(TRAIL_LENGTH)
+            trail.append(stamp, xs[i], ys[i])
+        if PREDICTOR is not None:
+            PREDICTOR.update_measurement(robot_id, stamp, batch.messages[i])
+        if RECORDER is not None:
+            RECORDER.append(stamp, robot_id, xs[i], ys[i], thetas[i], vs[i], omegas[i])
+
+    # Log for debugging
+    print(f"[VISUALIZER] Received {len(batch)} measurements from {
+          len(set(batch.device_ids))} robots")
 
 
 def main():
     """
     Parses command-line arguments, initializes Zenoh, and runs the visualizer.
     """
+    global OBSERVER, TRAIL_LENGTH, RECORDER, PREDICTOR
+
     # --- Argument Parsing ---
     parser = argparse.ArgumentParser(
         description="Navis Zenoh Multi-Robot Visualizer")
     parser.add_argument(
         "--dims", type=int, default=30,
         help="Plot dimensions in meters (from -dims to +dims)")
+    parser.add_argument(
+        "--trail-length", type=int, default=0,
+        help="Number of past poses kept per robot for its trail (0 disables trails)")
+    parser.add_argument(
+        "--zone", type=str, default="*",
+        help="Only show robots in this zone (default: all zones)")
+    parser.add_argument(
+        "--predict", action=argparse.BooleanOptionalAction, default=True,
+        help="Dead-reckon robot poses between measurements")
+    parser.add_argument(
+        "--record", type=str, default=None, metavar="FILE",
+        help="Save every received pose to this recording file")
+    parser.add_argument(
+        "--render", type=str, default=None, metavar="FILE",
+        help="Render this recording to a video headlessly instead of showing live data")
+    parser.add_argument(
+        "--output", type=str, default="fleet.mp4",
+        help="Video written by --render")
+    parser.add_argument(
+        "--fps", type=float, default=30,
+        help="Frames per second of the rendered video")
+    parser.add_argument(
+        "--speed", type=float, default=1.0,
+        help="Recorded seconds per second of rendered video")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of render processes (default: one per CPU)")
+    parser.add_argument(
+        "--size", type=int, default=1000,
+        help="Width and height of the rendered video in pixels")
     args = parser.parse_args()
     dims = args.dims
+    TRAIL_LENGTH = max(args.trail_length, 0)
+
+    if args.render:
+        from navis.render import render_recording
+        render_recording(args.render, args.output, fps=args.fps, speed=args.speed,
+                         dims=dims, size=args.size, workers=args.workers)
+        return
+
+    if args.predict:
+        PREDICTOR = FleetPredictor()
+
+    if args.record:
+        RECORDER = PoseRecorder(args.record)
+        print(f"[VISUALIZER] Recording poses to '{args.record}'")
 
     # --- Zenoh Setup ---
-    session = zenoh.open(Config())
-    # Subscribe to all robot measurement topics
-    sub = session.declare_subscriber(
-        "navis/robots/*/measurement", measurement_listener)
-    print("[VISUALIZER] Listening for robot measurements...")
+    # Observe the robot measurement topics of the selected zone(s)
+    OBSERVER = FleetObserver("measurement", Measurement, category=ROBOTS, zone=args.zone)
+    print(f"[VISUALIZER] Listening for robot measurements on '{OBSERVER.key}'...")
     print(f"[VISUALIZER] Arena dimensions set to: (-{dims}m, +{dims}m)")
 
     # --- Matplotlib Setup ---
@@ -82,9 +152,19 @@ def main():
 
     def update(frame):
         """Animation function that redraws all robots from the latest state."""
-        with STATE_LOCK:
-            states_copy = {rid: state.copy()
-                           for rid, state in ROBOT_STATES.items()}
+        # One trail point per horizontal pixel is all the plot can show.
+        max_trail_points = max(int(ax.bbox.width), 2)
+        ingest(OBSERVER.poll())
+        states_copy = {rid: {"x": meas.x, "y": meas.y, "theta": meas.theta}
+                       for rid, meas in OBSERVER.latest.items()}
+        trails_copy = {rid: trail.points(max_trail_points)
+                       for rid, trail in ROBOT_TRAILS.items()}
+        delivery = OBSERVER.tracker.stats()
+        if PREDICTOR is not None:
+            ids, xs, ys, thetas = PREDICTOR.predict(time.time())
+            for robot_id, x, y, theta in zip(ids, xs, ys, thetas):
+                if robot_id in states_copy:
+                    states_copy[robot_id] = {"x": x, "y": y, "theta": theta}
 
         ax.clear()
 
@@ -104,15 +184,30 @@ def main():
             return
 
         # Iterate through the copied states and draw each robot
+        trail_segments, trail_colors = [], []
         for robot_id, state in states_copy.items():
             x, y, theta = state["x"], state["y"], state["theta"]
-            robot_plot = ax.plot(x, y, "o", markersize=12, label=robot_id)
+            label = robot_id
+            stats = delivery.get(robot_id)
+            if stats is not None and stats.lost:
+                label = f"{robot_id} ({stats.loss_ratio:.1%} lost)"
+            robot_plot = ax.plot(x, y, "o", markersize=12, label=label)
             color = robot_plot[0].get_color()
             heading_x = x + heading_arrow_length * math.cos(theta)
             heading_y = y + heading_arrow_length * math.sin(theta)
             ax.plot([x, heading_x], [y, heading_y],
                     "-", linewidth=3, color=color)
 
+            trail = trails_copy.get(robot_id)
+            if trail is not None and len(trail) > 1:
+                trail_segments.append(trail)
+                trail_colors.append(color)
+
+        # All trails are drawn by a single artist, whatever the fleet size.
+        if trail_segments:
+            ax.add_collection(LineCollection(
+                trail_segments, colors=trail_colors, linewidths=1.5, alpha=0.6))
+
         ax.legend(loc="upper right")
 
     # Create and run the animation
@@ -123,7 +218,9 @@ def main():
     finally:
         # Clean up Zenoh session when the plot window is closed
         print("\n[VISUALIZER] Plot window closed, shutting down.")
-        session.close()
+        OBSERVER.close()
+        if RECORDER is not None:
+            RECORDER.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+Navis Zones
+===========
+
+Key expressions and zone maps for the Navis key space.
+
+Every device publishes under ``navis/<category>/<zone>/<device_id>/<topic>``.
+Consumers interested in part of the arena subscribe with a zone in the
+selector (e.g. ``navis/robots/aisle-3/*/measurement``), so the router only
+forwards that zone's traffic. Devices move between zones as their pose
+crosses the rectangles of a ``ZoneMap``.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Zone used by devices that have no zone map or are outside every zone.
+DEFAULT_ZONE = "default"
+
+_FORBIDDEN_CHUNK_CHARS = set("/*$?#")
+
+
+def _check_chunk(value: str, what: str):
+    """Raise ``ValueError`` if ``value`` cannot be a single key chunk."""
+    if not value or _FORBIDDEN_CHUNK_CHARS & set(value):
+        raise ValueError(f"Invalid {what} '{value}': must be non-empty and contain none of '/*$?#'.")
+
+
+def device_key(category: str, zone: str, device_id: str, topic: str) -> str:
+    """
+    Build the key expression of a device topic.
+
+    Args:
+        category (str): Device category (e.g., ``ROBOTS``).
+        zone (str): Zone name, or ``"*"`` to address the device in any zone.
+        device_id (str): The device ID.
+        topic (str): Topic suffix (e.g., ``"measurement"``).
+
+    Returns:
+        str: ``navis/<category>/<zone>/<device_id>/<topic>``.
+    """
+    return f"navis/{category}/{zone}/{device_id}/{topic}"
+
+
+def selector(category: str, zone: str = "*", device_id: str = "*", topic: str = "**") -> str:
+    """
+    Build a selector over devices, optionally restricted to a zone.
+
+    Args:
+        category (str): Device category (e.g., ``ROBOTS``).
+        zone (str): Zone name, or ``"*"`` for all zones.
+        device_id (str): The device ID, or ``"*"`` for all devices.
+        topic (str): Topic suffix, or ``"**"`` for all topics.
+
+    Returns:
+        str: The key expression to subscribe to.
+    """
+    return device_key(category, zone, device_id, topic)
+
+
+def parse_key(key_expr) -> Tuple[str, str, str, str]:
+    """
+    Split a device key expression into its parts.
+
+    Args:
+        key_expr: A key of the form ``navis/<category>/<zone>/<id>/<topic>``.
+
+    Returns:
+        Tuple[str, str, str, str]: ``(category, zone, device_id, topic)``.
+
+    Raises:
+        ValueError: If the key does not follow the Navis layout.
+    """
+    parts = str(key_expr).split("/", 4)
+    if len(parts) != 5 or parts[0] != "navis":
+        raise ValueError(f"Not a Navis device key: '{key_expr}'")
+    return parts[1], parts[2], parts[3], parts[4]
+
+
+@dataclass
+class Zone:
+    """
+    Axis-aligned rectangular zone of the arena.
+
+    Attributes:
+        name (str): Zone name used in key expressions.
+        x_min (float): Lower X bound in meters.
+        y_min (float): Lower Y bound in meters.
+        x_max (float): Upper X bound in meters.
+        y_max (float): Upper Y bound in meters.
+    """
+    name: str
+    x_min: float
+    y_min: float
+    x_max: float
+    y_max: float
+
+    def __post_init__(self):
+        _check_chunk(self.name, "zone name")
+
+    def contains(self, x: float, y: float, margin: float = 0.0) -> bool:
+        """Return whether ``(x, y)`` lies in the zone grown by ``margin``."""
+        return (self.x_min - margin <= x <= self.x_max + margin
+                and self.y_min - margin <= y <= self.y_max + margin)
+
+
+class ZoneMap:
+    """
+    Assigns positions to zones.
+
+    Zones are checked in order, so earlier zones win where they overlap.
+    A device stays in its current zone until it leaves it by more than
+    ``hysteresis`` meters, which avoids flapping on a boundary.
+    """
+
+    def __init__(self, zones: List[Zone], default: str = DEFAULT_ZONE, hysteresis: float = 0.5):
+        """
+        Initialize a zone map.
+
+        Args:
+            zones (List[Zone]): The zones of the arena.
+            default (str): Zone used for positions outside every zone.
+            hysteresis (float): Distance in meters a device must travel past
+                its current zone's boundary before it changes zone.
+        """
+        _check_chunk(default, "zone name")
+        self.zones = list(zones)
+        self.default = default
+        self.hysteresis = hysteresis
+        self._by_name = {zone.name: zone for zone in self.zones}
+
+    def locate(self, x: float, y: float, current: Optional[str] = None) -> str:
+        """
+        Return the zone a position belongs to.
+
+        Args:
+            x (float): X position in meters.
+            y (float): Y position in meters.
+            current (str, optional): The device's current zone.
+
+        Returns:
+            str: The name of the zone.
+        """
+        zone = self._by_name.get(current)
+        if zone is not None and zone.contains(x, y, self.hysteresis):
+            return current
+        for zone in self.zones:
+            if zone.contains(x, y):
+                return zone.name
+        return self.default